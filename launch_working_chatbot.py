@@ -1,12 +1,13 @@
 import streamlit as st
 import google.generativeai as genai
 import config
-import time
 from src.retrieval import IntelligentRetriever
 from verify_setup import verify_complete_setup
 import subprocess
 import sys
 import re
+import copy
+import json
 from datetime import datetime
 import os
 
@@ -44,6 +45,59 @@ def check_watchdog():
             return True
     return False
 
+# Empty user profile; always deepcopy it since the list fields are mutated in place
+DEFAULT_PROFILE = {
+    # Basic Info
+    "channel_name": None,
+    "name": None,
+    "age": None,
+    "location": None,
+    "profession": None,
+    
+    # Channel Details
+    "content_type": None,
+    "niche": None,
+    "subscriber_count": None,
+    "upload_frequency": None,
+    "channel_age": None,
+    
+    # Personal Preferences
+    "language_preference": "hinglish",
+    "experience_level": None,
+    "goals": [],
+    "interests": [],
+    "target_audience": None,
+    
+    # Technical Setup
+    "equipment": [],
+    "editing_software": None,
+    "budget": None,
+    
+    # Challenges & Aspirations
+    "main_challenges": [],
+    "inspiration": [],
+    "dream_collab": None,
+    
+    # Metadata
+    "last_updated": None,
+    "conversation_count": 0
+}
+
+# Sidebar display limits for list fields of the profile (None shows all)
+_DISPLAY_LIMITS = {"goals": None, "interests": 3, "equipment": 3, "inspiration": 2}
+
+# Profile fields that count as "the user has told us something"
+_PROFILE_KEYS = (
+    "channel_name", "name", "content_type", "age",
+    "location", "goals", "interests", "equipment"
+)
+
+# Chat avatars by role; None falls back to Streamlit's default
+_AVATARS = {"assistant": "🎯", "user": None}
+
+# Number of most recent messages rendered outside the history expander
+RECENT_MESSAGE_WINDOW = 20
+
 # Initialize session state at the module level
 if "app_state" not in st.session_state:
     st.session_state.app_state = {
@@ -55,94 +109,33 @@ if "app_state" not in st.session_state:
         "startup_complete": False,
         "initialization_attempted": False,
         "current_question": None,
-        "user_profile": {
-            # Basic Info
-            "channel_name": None,
-            "name": None,
-            "age": None,
-            "location": None,
-            "profession": None,
-            
-            # Channel Details
-            "content_type": None,
-            "niche": None,
-            "subscriber_count": None,
-            "upload_frequency": None,
-            "channel_age": None,
-            
-            # Personal Preferences
-            "language_preference": "hinglish",
-            "experience_level": None,
-            "goals": [],
-            "interests": [],
-            "target_audience": None,
-            
-            # Technical Setup
-            "equipment": [],
-            "editing_software": None,
-            "budget": None,
-            
-            # Challenges & Aspirations
-            "main_challenges": [],
-            "inspiration": [],
-            "dream_collab": None,
-            
-            # Metadata
-            "last_updated": None,
-            "conversation_count": 0
-        }
+        "user_profile": copy.deepcopy(DEFAULT_PROFILE)
     }
 
 # Safety check to ensure user_profile exists (in case of partial initialization)
 if "user_profile" not in st.session_state.app_state:
-    st.session_state.app_state["user_profile"] = {
-        # Basic Info
-        "channel_name": None,
-        "name": None,
-        "age": None,
-        "location": None,
-        "profession": None,
-        
-        # Channel Details
-        "content_type": None,
-        "niche": None,
-        "subscriber_count": None,
-        "upload_frequency": None,
-        "channel_age": None,
-        
-        # Personal Preferences
-        "language_preference": "hinglish",
-        "experience_level": None,
-        "goals": [],
-        "interests": [],
-        "target_audience": None,
-        
-        # Technical Setup
-        "equipment": [],
-        "editing_software": None,
-        "budget": None,
-        
-        # Challenges & Aspirations
-        "main_challenges": [],
-        "inspiration": [],
-        "dream_collab": None,
-        
-        # Metadata
-        "last_updated": None,
-        "conversation_count": 0
-    }
+    st.session_state.app_state["user_profile"] = copy.deepcopy(DEFAULT_PROFILE)
 
 @st.cache_resource(show_spinner=False)
 def get_retriever():
     """Get or create the retriever instance"""
     return IntelligentRetriever()
 
+@st.cache_resource(show_spinner=False)
+def get_model():
+    """Get or create the shared Gemini model instance"""
+    genai.configure(api_key=config.GOOGLE_API_KEY)
+    return genai.GenerativeModel(config.MODEL_NAME)
+
 @st.cache_resource(show_spinner=False)
 def get_chat():
     """Get or create the chat instance"""
-    genai.configure(api_key=config.GOOGLE_API_KEY)
-    model = genai.GenerativeModel(config.MODEL_NAME)
-    return model.start_chat(history=[])
+    return get_model().start_chat(history=[])
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_collection_stats(vector_store_id: int, _vector_store) -> dict:
+    """Get chunk counts per creator; collections only change at ingest time"""
+    return _vector_store.get_collection_stats()
 
 def initialize_app():
     """Initialize the app components"""
@@ -213,27 +206,26 @@ def is_topic_continuation(query: str, messages: list) -> bool:
     
     return has_continuation_keywords or topic_continuation
 
-def is_greeting_or_introduction(query: str) -> bool:
-    """Use AI to determine if the query is just a greeting or introduction"""
-    
-    # First check if this is a topic continuation
-    messages = st.session_state.app_state["messages"]
-    if is_topic_continuation(query, messages):
-        return False  # Don't treat topic continuations as greetings
-    
-    try:
-        # Create a simple prompt to classify the intent
-        classification_prompt = f"""Analyze this user message and determine the intent:
+# Shared frame for the intent classifiers; {{query}} survives the first format()
+# so each specialised prompt below is built once and filled per call.
+_INTENT_PROMPT = """Analyze this user message and determine the {task}:
 
-User message: "{query}"
+User message: "{{query}}"
 
 Respond with ONLY one word:
-- "GREETING" if it's ONLY a simple greeting or casual hello (like "hi", "hello", "hey", "namaste", "kaise ho")
-- "NAME_QUESTION" if they're asking ONLY about your name or identity (like "what's your name?", "who are you?", "aap ka name?")
-- "QUESTION" if they're asking for information, advice, or anything else (including questions about themselves, locations, YouTube help, etc.)
+{labels}
 
 Examples:
-- "hi" → GREETING
+{examples}
+{notes}
+Your response (one word only):"""
+
+_GREETING_INTENT_PROMPT = _INTENT_PROMPT.format(
+    task="intent",
+    labels="""- "GREETING" if it's ONLY a simple greeting or casual hello (like "hi", "hello", "hey", "namaste", "kaise ho")
+- "NAME_QUESTION" if they're asking ONLY about your name or identity (like "what's your name?", "who are you?", "aap ka name?")
+- "QUESTION" if they're asking for information, advice, or anything else (including questions about themselves, locations, YouTube help, etc.)""",
+    examples="""- "hi" → GREETING
 - "hello bhai" → GREETING
 - "namaste" → GREETING
 - "what's your name?" → NAME_QUESTION
@@ -242,18 +234,68 @@ Examples:
 - "how to grow channel?" → QUESTION
 - "what are best thumbnails?" → QUESTION
 - "tell me about myself" → QUESTION
-- "where do I live?" → QUESTION
-
+- "where do I live?" → QUESTION""",
+    notes="""
 IMPORTANT: If they're asking for ANY information or advice (even about themselves), classify as QUESTION, not GREETING.
+""",
+)
 
-Your response (one word only):"""
+_RESPONSE_TYPE_PROMPT = _INTENT_PROMPT.format(
+    task="response type needed",
+    labels="""- "SIMPLE_GREETING" for basic greetings (hi, hello, kaise ho, etc.)
+- "NAME_QUESTION" for name/identity questions (what's your name, who are you, etc.)
+- "INTRODUCTION" for user introductions (I am John, my name is, etc.)""",
+    examples="""- "hi" → SIMPLE_GREETING
+- "kaise ho?" → SIMPLE_GREETING
+- "what's your name?" → NAME_QUESTION
+- "who are you?" → NAME_QUESTION
+- "aap ka name?" → NAME_QUESTION
+- "I am Hari" → INTRODUCTION""",
+    notes="",
+)
 
-        # Use the existing chat instance for classification
-        model = genai.GenerativeModel(config.MODEL_NAME)
-        temp_chat = model.start_chat(history=[])
-        response = temp_chat.send_message(classification_prompt)
-        
-        result = response.text.strip().upper()
+# Bare greetings are answered without asking the model to classify them
+_SIMPLE_GREETING_RE = re.compile(
+    r"^(?:hi|hello|hey|namaste|hola|salaam|kaise ho)(?: (?:bhai|dost|ji|yaar))?[\s!.?]*$"
+)
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so similar queries share a cache key"""
+    return " ".join(query.lower().split())
+
+def is_bare_greeting(query: str) -> bool:
+    """Check if the query is nothing but a simple greeting (hi, namaste bhai, etc.)"""
+    return bool(_SIMPLE_GREETING_RE.match(normalize_query(query)))
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def classify_intent(normalized_query: str) -> str:
+    """Ask the model for the intent label of a normalized query (cached across reruns)"""
+    classification_prompt = _GREETING_INTENT_PROMPT.format(query=normalized_query)
+    temp_chat = get_model().start_chat(history=[])
+    response = temp_chat.send_message(classification_prompt)
+    return response.text.strip().upper()
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def classify_response_type(normalized_query: str) -> str:
+    """Ask the model for the greeting response type of a normalized query (cached across reruns)"""
+    classification_prompt = _RESPONSE_TYPE_PROMPT.format(query=normalized_query)
+    temp_chat = get_model().start_chat(history=[])
+    response = temp_chat.send_message(classification_prompt)
+    return response.text.strip().upper()
+
+def is_greeting_or_introduction(query: str) -> bool:
+    """Use AI to determine if the query is just a greeting or introduction"""
+    
+    # First check if this is a topic continuation
+    messages = st.session_state.app_state["messages"]
+    if is_topic_continuation(query, messages):
+        return False  # Don't treat topic continuations as greetings
+    
+    if is_bare_greeting(query):
+        return True
+    
+    try:
+        result = classify_intent(normalize_query(query))
         return result in ["GREETING", "NAME_QUESTION"]
         
     except Exception as e:
@@ -266,35 +308,49 @@ Your response (one word only):"""
 
 def get_greeting_response_type(query: str) -> str:
     """Determine the type of greeting response needed"""
+    if is_bare_greeting(query):
+        return "SIMPLE_GREETING"
+    
     try:
-        classification_prompt = f"""Analyze this user message and determine the response type needed:
+        return classify_response_type(normalize_query(query))
+            
+    except Exception as e:
+        print(f"Greeting type detection error: {e}")
+        return "SIMPLE_GREETING"
 
-User message: "{query}"
+# Greeting reply prompts keyed by get_greeting_response_type() result
+GREETING_TEMPLATES = {
+    "NAME_QUESTION": """You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
 
-Respond with ONLY one word:
-- "SIMPLE_GREETING" for basic greetings (hi, hello, kaise ho, etc.)
-- "NAME_QUESTION" for name/identity questions (what's your name, who are you, etc.)
-- "INTRODUCTION" for user introductions (I am John, my name is, etc.)
+The user asked: "{query}"
 
-Examples:
-- "hi" → SIMPLE_GREETING
-- "kaise ho?" → SIMPLE_GREETING
-- "what's your name?" → NAME_QUESTION
-- "who are you?" → NAME_QUESTION
-- "aap ka name?" → NAME_QUESTION
-- "I am Hari" → INTRODUCTION
+Respond with a warm, natural introduction in Hinglish. Include your credentials.
 
-Your response (one word only):"""
+Example style:
+"Namaste! Main Hawa Singh hoon - YouTube growth expert with 500K+ subscribers. Aapki channel ki growth mein help karta hoon. Kya puchna chahte ho?"
 
-        model = genai.GenerativeModel(config.MODEL_NAME)
-        temp_chat = model.start_chat(history=[])
-        response = temp_chat.send_message(classification_prompt)
-        
-        return response.text.strip().upper()
-            
-    except Exception as e:
-        print(f"Greeting type detection error: {e}")
-        return "SIMPLE_GREETING"
+Keep it natural, warm, and under 30 words.""",
+    "INTRODUCTION": """You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
+
+The user introduced themselves: "{query}"
+
+Respond warmly, acknowledge their introduction, and introduce yourself naturally in Hinglish.
+
+Example style:
+"Nice to meet you! Main Hawa Singh hoon, YouTube expert with 500K+ subscribers. Aapki journey mein help karunga. Kya chahiye help?"
+
+Keep it natural, warm, and under 30 words.""",
+    "SIMPLE_GREETING": """You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
+
+The user greeted you: "{query}"
+
+Respond with a warm, natural greeting back in Hinglish. Be friendly and inviting.
+
+Example style:
+"Namaste dost! Kaise ho? Main Hawa Singh - YouTube expert with 500K+ subscribers. Kya help chahiye aaj?"
+
+Keep it natural, warm, and under 30 words.""",
+}
 
 def is_inappropriate_content(query: str) -> bool:
     """Check if the query contains inappropriate content"""
@@ -425,41 +481,7 @@ Keep it professional, brief, and redirect to YouTube topics."""
         # Get the specific type of greeting response needed
         response_type = get_greeting_response_type(query)
         
-        if response_type == "NAME_QUESTION":
-            return f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user asked: "{query}"
-
-Respond with a warm, natural introduction in Hinglish. Include your credentials.
-
-Example style:
-"Namaste! Main Hawa Singh hoon - YouTube growth expert with 500K+ subscribers. Aapki channel ki growth mein help karta hoon. Kya puchna chahte ho?"
-
-Keep it natural, warm, and under 30 words."""
-        
-        elif response_type == "INTRODUCTION":
-            return f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user introduced themselves: "{query}"
-
-Respond warmly, acknowledge their introduction, and introduce yourself naturally in Hinglish.
-
-Example style:
-"Nice to meet you! Main Hawa Singh hoon, YouTube expert with 500K+ subscribers. Aapki journey mein help karunga. Kya chahiye help?"
-
-Keep it natural, warm, and under 30 words."""
-        
-        else:  # SIMPLE_GREETING
-            return f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user greeted you: "{query}"
-
-Respond with a warm, natural greeting back in Hinglish. Be friendly and inviting.
-
-Example style:
-"Namaste dost! Kaise ho? Main Hawa Singh - YouTube expert with 500K+ subscribers. Kya help chahiye aaj?"
-
-Keep it natural, warm, and under 30 words."""
+        return GREETING_TEMPLATES.get(response_type, GREETING_TEMPLATES["SIMPLE_GREETING"]).format(query=query)
     
     # Check if user is asking about their own information
     personal_info_queries = [
@@ -631,6 +653,7 @@ RESPONSE FORMAT:
 
 Respond with specific, helpful information based on the context provided!"""
 
+@st.cache_data(ttl=24 * 60 * 60, max_entries=256, show_spinner=False)
 def clean_response_formatting(response_text: str) -> str:
     """Clean and format response to ensure proper markdown structure"""
     if not response_text:
@@ -669,6 +692,49 @@ def clean_response_formatting(response_text: str) -> str:
     
     return result.strip()
 
+def stream_response_text(response):
+    """Yield text from a streaming Gemini response as chunks arrive"""
+    for chunk in response:
+        # Chunks without text (e.g. safety metadata) are skipped
+        if chunk.parts:
+            yield chunk.text
+
+def build_debug_info(query: str, is_simple_greeting: bool) -> dict:
+    """Collect the per-turn classification results shown in debug mode"""
+    return {
+        "is_simple_greeting": is_simple_greeting,
+        # Cached classifier, so the reply path reuses this result
+        "response_type": get_greeting_response_type(query) if is_simple_greeting else None,
+        "is_step_by_step_question": is_step_by_step_question(query),
+    }
+
+def render_debug_info(debug_info: dict) -> None:
+    """Show the collected debug info as a single element"""
+    st.code(json.dumps(debug_info, indent=2, ensure_ascii=False), language="json")
+
+def render_context_chunks(chunks: list) -> None:
+    """Show retrieved context chunks in debug mode"""
+    if not st.session_state.app_state["debug_mode"]:
+        return
+    
+    with st.expander("🔍 Retrieved Context Chunks", expanded=True):
+        for i, chunk in enumerate(chunks):
+            # Handle different chunk structures with better error handling
+            try:
+                score = chunk.get('score', chunk.get('similarity', 'N/A'))
+                # Only stringify the whole chunk when it has no text field
+                content = chunk.get('content', chunk.get('text'))
+                if content is None:
+                    content = str(chunk)
+                
+                st.write(f"**Chunk {i+1}** (Score: {score})")
+                st.code(content)
+                st.markdown("---")
+            except Exception:
+                st.write(f"**Chunk {i+1}** (Error displaying chunk)")
+                st.code(f"Chunk data: {str(chunk)}")
+                st.markdown("---")
+
 def format_chat_history(messages: list, max_messages: int = 6) -> str:
     """Format chat history for context with configurable limit"""
     if not messages:
@@ -945,12 +1011,29 @@ def extract_user_info(message: str, current_profile: dict) -> dict:
             if len(inspiration) > 2 and inspiration not in updated_profile["inspiration"]:
                 updated_profile["inspiration"].append(inspiration)
     
+    # Cache sidebar display strings for the list fields
+    for key, limit in _DISPLAY_LIMITS.items():
+        updated_profile[f"_{key}_display"] = summarize_items(updated_profile[key], limit)
+    
     # Update metadata
     updated_profile["last_updated"] = datetime.now().isoformat()
     updated_profile["conversation_count"] = updated_profile.get("conversation_count", 0) + 1
     
     return updated_profile
 
+def summarize_items(items: list, limit: int = None) -> str:
+    """Title-case up to `limit` items and note how many more there are"""
+    if limit is None or len(items) <= limit:
+        return ", ".join(item.title() for item in items)
+    return ", ".join(item.title() for item in items[:limit]) + f" +{len(items) - limit} more"
+
+def profile_display(profile: dict, key: str) -> str:
+    """Get the cached sidebar display string for a list field of the profile"""
+    display = profile.get(f"_{key}_display")
+    if display is None:
+        display = summarize_items(profile[key], _DISPLAY_LIMITS[key])
+    return display
+
 def format_user_context(profile: dict) -> str:
     """Format user profile for system prompt"""
     context_parts = []
@@ -1093,6 +1176,308 @@ def manage_conversation_length(messages: list, max_messages: int = 30, preserve_
     
     return managed_messages
 
+_RATE_LIMIT_MESSAGE = """🚫 I apologize, but I'm currently experiencing high traffic and have hit the API rate limit.
+
+Please try:
+1. Waiting a minute before asking another question
+2. Making your question more specific and focused
+3. Coming back in a few minutes if the issue persists
+
+This is a temporary limitation and I'll be happy to help you once the rate limit resets!"""
+
+_EMBEDDING_ERROR_MESSAGE = """🤔 I'm having trouble understanding your query. Could you try:
+
+1. Rephrasing your question
+2. Being more specific about what you want to know
+3. Using complete sentences
+
+This will help me provide a better response!"""
+
+_GENERIC_ERROR_TEMPLATE = """⚠️ I encountered an issue while processing your request.
+
+The specific error was: {error}
+
+Please try again in a moment."""
+
+# (needle, message) pairs checked in order; a needle is a substring or a compiled pattern
+_ERROR_RULES = (
+    ("429", _RATE_LIMIT_MESSAGE),
+    (re.compile(r"embedding", re.IGNORECASE), _EMBEDDING_ERROR_MESSAGE),
+)
+
+def format_error_message(error: str) -> str:
+    """Map a raised error to the message shown to the user"""
+    for needle, message in _ERROR_RULES:
+        if (needle in error) if isinstance(needle, str) else needle.search(error):
+            return message
+    return _GENERIC_ERROR_TEMPLATE.format(error=error)
+
+def render_messages(messages: list) -> None:
+    """Render chat messages with the creator avatar on assistant replies"""
+    for message in messages:
+        with st.chat_message(message["role"], avatar=_AVATARS.get(message["role"])):
+            st.markdown(message["content"])
+
+@st.dialog("Reset profile?")
+def reset_profile_dialog():
+    """Confirm and reset the user profile to its defaults"""
+    st.warning("⚠️ This clears everything Hawa Singh has learned about you.")
+    if st.button("Confirm reset"):
+        st.session_state.app_state["user_profile"] = copy.deepcopy(DEFAULT_PROFILE)
+        st.rerun()
+
+@st.dialog("Clear chat history?")
+def clear_chat_dialog():
+    """Confirm and clear the chat history"""
+    st.warning("⚠️ This removes all messages in the current conversation.")
+    if st.button("Confirm clear"):
+        st.session_state.app_state["messages"] = []
+        st.session_state.app_state["chat"] = get_model().start_chat(history=[])
+        st.rerun()
+
+@st.fragment
+def render_sidebar():
+    """Render the sidebar; widget events inside it rerun only this fragment"""
+    st.header("📊 Knowledge Base Stats")
+    vector_store = st.session_state.app_state["retriever"].vector_store
+    stats = get_collection_stats(id(vector_store), vector_store)
+    st.metric("🎯 Hawa Singh", f"{stats.get('hawa_singh', 0)} chunks")
+    
+    # User Profile Section
+    st.markdown("### 👤 Your Profile")
+    profile = st.session_state.app_state["user_profile"]
+    
+    # Build every profile section into one Markdown body so the
+    # sidebar is sent as a single element instead of one per line
+    parts = []
+    
+    # Basic Info Section
+    if any([profile.get("name"), profile.get("age"), profile.get("location")]):
+        parts.append("**🏠 Basic Info**")
+        if profile.get("name"):
+            parts.append(f"👋 **Name:** {profile['name']}")
+        if profile.get("age"):
+            parts.append(f"🎂 **Age:** {profile['age']} years")
+        if profile.get("location"):
+            parts.append(f"📍 **Location:** {profile['location']}")
+        if profile.get("profession"):
+            parts.append(f"💼 **Profession:** {profile['profession']}")
+        parts.append("---")
+    
+    # Channel Info Section
+    if any([profile.get("channel_name"), profile.get("content_type"), profile.get("subscriber_count")]):
+        parts.append("**📺 Channel Info**")
+        if profile.get("channel_name"):
+            parts.append(f"🎯 **Channel:** {profile['channel_name']}")
+        if profile.get("content_type"):
+            content_display = profile['content_type'].title()
+            if profile.get("niche"):
+                content_display += f" ({profile['niche'].title()})"
+            parts.append(f"🎬 **Content:** {content_display}")
+        if profile.get("subscriber_count"):
+            parts.append(f"👥 **Subscribers:** {profile['subscriber_count']}")
+        if profile.get("upload_frequency"):
+            parts.append(f"📅 **Upload:** {profile['upload_frequency'].title()}")
+        if profile.get("experience_level"):
+            parts.append(f"⭐ **Level:** {profile['experience_level'].title()}")
+        parts.append("---")
+    
+    # Goals & Interests Section
+    if profile.get("goals") or profile.get("interests"):
+        parts.append("**🎯 Goals & Interests**")
+        if profile.get("goals"):
+            parts.append(f"🚀 **Goals:** {profile_display(profile, 'goals')}")
+        if profile.get("interests"):
+            parts.append(f"❤️ **Interests:** {profile_display(profile, 'interests')}")
+        if profile.get("target_audience"):
+            parts.append(f"👥 **Audience:** {profile['target_audience']}")
+        parts.append("---")
+    
+    # Technical Setup Section
+    if profile.get("equipment") or profile.get("editing_software") or profile.get("budget"):
+        parts.append("**🛠️ Technical Setup**")
+        if profile.get("equipment"):
+            parts.append(f"📷 **Equipment:** {profile_display(profile, 'equipment')}")
+        if profile.get("editing_software"):
+            parts.append(f"✂️ **Editing:** {profile['editing_software'].title()}")
+        if profile.get("budget"):
+            parts.append(f"💰 **Budget:** ₹{profile['budget']}")
+        parts.append("---")
+    
+    # Challenges & Inspiration Section
+    if profile.get("main_challenges") or profile.get("inspiration"):
+        parts.append("**💪 Growth Journey**")
+        if profile.get("main_challenges"):
+            challenges_count = len(profile['main_challenges'])
+            parts.append(f"⚠️ **Challenges:** {challenges_count} identified")
+        if profile.get("inspiration"):
+            parts.append(f"✨ **Inspired by:** {profile_display(profile, 'inspiration')}")
+        if profile.get("dream_collab"):
+            parts.append(f"🤝 **Dream Collab:** {profile['dream_collab']}")
+        parts.append("---")
+    
+    # Conversation Stats
+    if profile.get("conversation_count", 0) > 0:
+        parts.append("**📊 Stats**")
+        parts.append(f"💬 **Conversations:** {profile['conversation_count']}")
+        if profile.get("last_updated"):
+            try:
+                last_update = datetime.fromisoformat(profile['last_updated'])
+                parts.append(f"🕒 **Last Updated:** {last_update.strftime('%b %d, %Y')}")
+            except ValueError:
+                pass
+        parts.append("---")
+    
+    # Show message if profile is empty
+    if not any(profile.get(key) for key in _PROFILE_KEYS):
+        parts.append("💬 *Tell me about yourself, your channel, age, location, interests, and goals to get highly personalized advice!*")
+        parts.append("**Try saying:**")
+        parts.append("\n".join([
+            "- 'I'm 25 years old from Mumbai'",
+            "- 'My channel is about travel'",
+            "- 'I have 500 subscribers'",
+            "- 'I love photography and editing'"
+        ]))
+    
+    if parts:
+        st.markdown("\n\n".join(parts))
+    
+    # Profile reset asks for confirmation in a dialog
+    if st.button("🔄 Reset Profile"):
+        reset_profile_dialog()
+    
+    # Chat History Management Section
+    st.markdown("### 💬 Chat Management")
+    
+    # Show current conversation stats
+    msg_count = len(st.session_state.app_state["messages"])
+    if msg_count > 0:
+        total_chars = sum(len(msg["content"]) for msg in st.session_state.app_state["messages"])
+        estimated_tokens = total_chars // 4
+        st.metric("Messages", msg_count)
+        st.metric("Est. Tokens", f"~{estimated_tokens}")
+        
+        # Context preservation settings
+        st.markdown("**Context Settings:**")
+        
+        # Let users choose how much context to preserve
+        context_options = {
+            "Minimal (4 messages)": 4,
+            "Balanced (6 messages)": 6, 
+            "Extended (8 messages)": 8,
+            "Maximum (12 messages)": 12
+        }
+        
+        selected_context = st.selectbox(
+            "Chat Context Level",
+            options=list(context_options.keys()),
+            index=1,  # Default to "Balanced"
+            help="How many recent messages to include as context for AI responses"
+        )
+        
+        # Store the selection in session state
+        st.session_state.app_state["context_limit"] = context_options[selected_context]
+        
+        # Auto-trim option
+        auto_trim = st.checkbox(
+            "Auto-trim long conversations", 
+            value=True,
+            help="Automatically manage conversation length to prevent token overflow"
+        )
+        st.session_state.app_state["auto_trim"] = auto_trim
+        
+        # Manual trim button for long conversations
+        if msg_count > 20:
+            if st.button("✂️ Trim Old Messages"):
+                if st.session_state.get("confirm_trim", False):
+                    # Apply smart trimming
+                    st.session_state.app_state["messages"] = manage_conversation_length(
+                        st.session_state.app_state["messages"],
+                        max_messages=20,
+                        preserve_recent=10
+                    )
+                    st.session_state.confirm_trim = False
+                    st.success("✅ Conversation trimmed successfully!")
+                    st.rerun()
+                else:
+                    st.session_state.confirm_trim = True
+                    st.warning("⚠️ Click again to confirm trimming")
+    else:
+        st.info("No messages yet. Start a conversation!")
+    
+    st.markdown("---")
+    
+    # Experience rating
+    st.markdown("### 🌟 Rate Your Experience")
+    st.slider("How helpful is Hawa Singh?", 1, 5, key="experience_rating")
+    
+    # Debug mode toggle; debug output lives in the main body, so a change
+    # needs a full app rerun rather than just this fragment
+    debug_mode = st.checkbox("🔧 Debug Mode", value=st.session_state.app_state.get("debug_mode", False))
+    if debug_mode != st.session_state.app_state.get("debug_mode", False):
+        st.session_state.app_state["debug_mode"] = debug_mode
+        st.rerun()
+    
+    # Clear chat button with confirmation dialog
+    if st.button("🗑️ Clear Chat History"):
+        clear_chat_dialog()
+    
+    if st.session_state.app_state["debug_mode"]:
+        st.text("Debug Info:")
+        st.text(f"Initialized: {st.session_state.app_state['initialized']}")
+        st.text(f"Messages: {len(st.session_state.app_state['messages'])}")
+        st.text(f"Retriever: {st.session_state.app_state['retriever'] is not None}")
+        st.text(f"Chat: {st.session_state.app_state['chat'] is not None}")
+        
+        # Add profile debug information
+        profile = st.session_state.app_state["user_profile"]
+        st.text("User Profile Debug:")
+        st.text(f"  Name: {profile.get('name', 'None')}")
+        st.text(f"  Channel: {profile.get('channel_name', 'None')}")
+        st.text(f"  Age: {profile.get('age', 'None')}")
+        st.text(f"  Location: {profile.get('location', 'None')}")
+        st.text(f"  Content Type: {profile.get('content_type', 'None')}")
+        st.text(f"  Subscribers: {profile.get('subscriber_count', 'None')}")
+        
+        # Add token usage information
+        if st.session_state.app_state["chat"]:
+            try:
+                # Estimate token usage (rough calculation)
+                total_chars = sum(len(msg["content"]) for msg in st.session_state.app_state["messages"])
+                estimated_tokens = total_chars // 4  # Rough estimate: 4 chars per token
+                st.text(f"Estimated Tokens: ~{estimated_tokens}")
+                st.text(f"Chat History Length: {len(st.session_state.app_state['chat'].history)}")
+                
+                # Show configurable chat history in debug
+                if len(st.session_state.app_state["messages"]) > 0:
+                    # Smart preview limit based on conversation length
+                    if len(st.session_state.app_state["messages"]) <= 4:
+                        preview_limit = len(st.session_state.app_state["messages"])
+                    elif len(st.session_state.app_state["messages"]) <= 10:
+                        preview_limit = 6
+                    else:
+                        preview_limit = 8
+                    
+                    with st.expander(f"🔍 Recent Chat Context (Last {preview_limit} Messages)", expanded=False):
+                        recent_messages = st.session_state.app_state["messages"][-preview_limit:]
+                        for i, msg in enumerate(recent_messages):
+                            role_emoji = "🎯" if msg['role'] == "assistant" else "👤"
+                            content_preview = msg['content'][:150] + "..." if len(msg['content']) > 150 else msg['content']
+                            st.write(f"{role_emoji} **{msg['role'].title()}:** {content_preview}")
+                        
+                        # Show token usage for this preview
+                        preview_chars = sum(len(msg["content"]) for msg in recent_messages)
+                        preview_tokens = preview_chars // 4
+                        st.caption(f"Preview tokens: ~{preview_tokens} | Total conversation: ~{estimated_tokens}")
+                    
+                    # Add conversation management options
+                    if len(st.session_state.app_state["messages"]) > 20:
+                        st.warning(f"⚠️ Long conversation ({len(st.session_state.app_state['messages'])} messages). Consider clearing history to improve performance.")
+                        
+            except Exception as e:
+                st.text(f"Token info error: {str(e)}")
+
+
 def main():
     # Initialize app
     if not initialize_app():
@@ -1137,21 +1522,16 @@ def main():
         if not st.session_state.app_state["initialized"]:
             return
         
+        debug = st.session_state.app_state["debug_mode"]
+        
         # Use AI to detect if it's a greeting or introduction
         is_simple_greeting = is_greeting_or_introduction(question)
-        
-        # Debug info for greeting detection
-        if st.session_state.app_state["debug_mode"]:
-            st.write(f"🔍 Debug: is_simple_greeting = {is_simple_greeting}")
-            if is_simple_greeting:
-                response_type = get_greeting_response_type(question)
-                st.write(f"🔍 Debug: response_type = {response_type}")
-            
-            # Add step-by-step detection debug
-            is_step_question = is_step_by_step_question(question)
-            st.write(f"🔍 Debug: is_step_by_step_question = {is_step_question}")
+        debug_info = build_debug_info(question, is_simple_greeting) if debug else None
         
         if is_simple_greeting:
+            if debug:
+                render_debug_info(debug_info)
+            
             # For simple greetings, use completely clean response without any personalization
             simple_prompt = f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
 
@@ -1170,26 +1550,13 @@ Keep it natural, warm, and under 25 words."""
             context = st.session_state.app_state["retriever"].retrieve_context(question)
             
             # Show debug info about context retrieval
-            if st.session_state.app_state["debug_mode"]:
-                st.write(f"🔍 Debug: Context retrieval triggered for: '{question}'")
-                st.write(f"📊 Debug: Retrieved {len(context['context']['chunks'])} chunks")
+            if debug:
+                debug_info["context_retrieval_for"] = question
+                debug_info["retrieved_chunks"] = len(context['context']['chunks'])
+                render_debug_info(debug_info)
             
             # Show debug info about chunks BEFORE generating response
-            if st.session_state.app_state["debug_mode"]:
-                with st.expander("🔍 Retrieved Context Chunks", expanded=True):
-                    for i, chunk in enumerate(context['context']['chunks']):
-                        # Handle different chunk structures with better error handling
-                        try:
-                            score = chunk.get('score', chunk.get('similarity', 'N/A'))
-                            content = chunk.get('content', chunk.get('text', str(chunk)))
-                            
-                            st.write(f"**Chunk {i+1}** (Score: {score})")
-                            st.code(content)
-                            st.markdown("---")
-                        except Exception as chunk_error:
-                            st.write(f"**Chunk {i+1}** (Error displaying chunk)")
-                            st.code(f"Chunk data: {str(chunk)}")
-                            st.markdown("---")
+            render_context_chunks(context['context']['chunks'])
             
             system_prompt = get_system_prompt(context, question)
             response = st.session_state.app_state["chat"].send_message(system_prompt)
@@ -1220,305 +1587,16 @@ Keep it natural, warm, and under 25 words."""
     
     # Sidebar enhancements
     with st.sidebar:
-        st.header("📊 Knowledge Base Stats")
-        stats = st.session_state.app_state["retriever"].vector_store.get_collection_stats()
-        st.metric("🎯 Hawa Singh", f"{stats.get('hawa_singh', 0)} chunks")
-        
-        # User Profile Section
-        st.markdown("### 👤 Your Profile")
-        profile = st.session_state.app_state["user_profile"]
-        
-        # Basic Info Section
-        if any([profile.get("name"), profile.get("age"), profile.get("location")]):
-            st.markdown("**🏠 Basic Info**")
-            if profile.get("name"):
-                st.write(f"👋 **Name:** {profile['name']}")
-            if profile.get("age"):
-                st.write(f"🎂 **Age:** {profile['age']} years")
-            if profile.get("location"):
-                st.write(f"📍 **Location:** {profile['location']}")
-            if profile.get("profession"):
-                st.write(f"💼 **Profession:** {profile['profession']}")
-            st.markdown("---")
-        
-        # Channel Info Section
-        if any([profile.get("channel_name"), profile.get("content_type"), profile.get("subscriber_count")]):
-            st.markdown("**📺 Channel Info**")
-            if profile.get("channel_name"):
-                st.write(f"🎯 **Channel:** {profile['channel_name']}")
-            if profile.get("content_type"):
-                content_display = profile['content_type'].title()
-                if profile.get("niche"):
-                    content_display += f" ({profile['niche'].title()})"
-                st.write(f"🎬 **Content:** {content_display}")
-            if profile.get("subscriber_count"):
-                st.write(f"👥 **Subscribers:** {profile['subscriber_count']}")
-            if profile.get("upload_frequency"):
-                st.write(f"📅 **Upload:** {profile['upload_frequency'].title()}")
-            if profile.get("experience_level"):
-                st.write(f"⭐ **Level:** {profile['experience_level'].title()}")
-            st.markdown("---")
-        
-        # Goals & Interests Section
-        if profile.get("goals") or profile.get("interests"):
-            st.markdown("**🎯 Goals & Interests**")
-            if profile.get("goals"):
-                goals_display = ", ".join([goal.title() for goal in profile['goals']])
-                st.write(f"🚀 **Goals:** {goals_display}")
-            if profile.get("interests"):
-                interests_display = ", ".join([interest.title() for interest in profile['interests'][:3]])  # Show first 3
-                if len(profile['interests']) > 3:
-                    interests_display += f" +{len(profile['interests'])-3} more"
-                st.write(f"❤️ **Interests:** {interests_display}")
-            if profile.get("target_audience"):
-                st.write(f"👥 **Audience:** {profile['target_audience']}")
-            st.markdown("---")
-        
-        # Technical Setup Section
-        if profile.get("equipment") or profile.get("editing_software") or profile.get("budget"):
-            st.markdown("**🛠️ Technical Setup**")
-            if profile.get("equipment"):
-                equipment_display = ", ".join([eq.title() for eq in profile['equipment'][:3]])
-                if len(profile['equipment']) > 3:
-                    equipment_display += f" +{len(profile['equipment'])-3} more"
-                st.write(f"📷 **Equipment:** {equipment_display}")
-            if profile.get("editing_software"):
-                st.write(f"✂️ **Editing:** {profile['editing_software'].title()}")
-            if profile.get("budget"):
-                st.write(f"💰 **Budget:** ₹{profile['budget']}")
-            st.markdown("---")
-        
-        # Challenges & Inspiration Section
-        if profile.get("main_challenges") or profile.get("inspiration"):
-            st.markdown("**💪 Growth Journey**")
-            if profile.get("main_challenges"):
-                challenges_count = len(profile['main_challenges'])
-                st.write(f"⚠️ **Challenges:** {challenges_count} identified")
-            if profile.get("inspiration"):
-                inspiration_display = ", ".join([insp.title() for insp in profile['inspiration'][:2]])
-                if len(profile['inspiration']) > 2:
-                    inspiration_display += f" +{len(profile['inspiration'])-2} more"
-                st.write(f"✨ **Inspired by:** {inspiration_display}")
-            if profile.get("dream_collab"):
-                st.write(f"🤝 **Dream Collab:** {profile['dream_collab']}")
-            st.markdown("---")
-        
-        # Conversation Stats
-        if profile.get("conversation_count", 0) > 0:
-            st.markdown("**📊 Stats**")
-            st.write(f"💬 **Conversations:** {profile['conversation_count']}")
-            if profile.get("last_updated"):
-                from datetime import datetime
-                try:
-                    last_update = datetime.fromisoformat(profile['last_updated'])
-                    st.write(f"🕒 **Last Updated:** {last_update.strftime('%b %d, %Y')}")
-                except:
-                    pass
-            st.markdown("---")
-        
-        # Show message if profile is empty
-        if not any([
-            profile.get("channel_name"), profile.get("name"), profile.get("content_type"),
-            profile.get("age"), profile.get("location"), profile.get("goals"),
-            profile.get("interests"), profile.get("equipment")
-        ]):
-            st.write("💬 *Tell me about yourself, your channel, age, location, interests, and goals to get highly personalized advice!*")
-            st.markdown("**Try saying:**")
-            st.markdown("- 'I'm 25 years old from Mumbai'")
-            st.markdown("- 'My channel is about travel'")
-            st.markdown("- 'I have 500 subscribers'")
-            st.markdown("- 'I love photography and editing'")
-        
-        # Enhanced profile reset with confirmation
-        if st.button("🔄 Reset Profile"):
-            if st.session_state.get("confirm_profile_reset", False):
-                st.session_state.app_state["user_profile"] = {
-                    # Basic Info
-                    "channel_name": None,
-                    "name": None,
-                    "age": None,
-                    "location": None,
-                    "profession": None,
-                    
-                    # Channel Details
-                    "content_type": None,
-                    "niche": None,
-                    "subscriber_count": None,
-                    "upload_frequency": None,
-                    "channel_age": None,
-                    
-                    # Personal Preferences
-                    "language_preference": "hinglish",
-                    "experience_level": None,
-                    "goals": [],
-                    "interests": [],
-                    "target_audience": None,
-                    
-                    # Technical Setup
-                    "equipment": [],
-                    "editing_software": None,
-                    "budget": None,
-                    
-                    # Challenges & Aspirations
-                    "main_challenges": [],
-                    "inspiration": [],
-                    "dream_collab": None,
-                    
-                    # Metadata
-                    "last_updated": None,
-                    "conversation_count": 0
-                }
-                st.session_state.confirm_profile_reset = False
-                st.success("✅ Profile reset successfully!")
-                st.rerun()
-            else:
-                st.session_state.confirm_profile_reset = True
-                st.warning("⚠️ Click again to confirm profile reset")
-        
-        # Chat History Management Section
-        st.markdown("### 💬 Chat Management")
-        
-        # Show current conversation stats
-        msg_count = len(st.session_state.app_state["messages"])
-        if msg_count > 0:
-            total_chars = sum(len(msg["content"]) for msg in st.session_state.app_state["messages"])
-            estimated_tokens = total_chars // 4
-            st.metric("Messages", msg_count)
-            st.metric("Est. Tokens", f"~{estimated_tokens}")
-            
-            # Context preservation settings
-            st.markdown("**Context Settings:**")
-            
-            # Let users choose how much context to preserve
-            context_options = {
-                "Minimal (4 messages)": 4,
-                "Balanced (6 messages)": 6, 
-                "Extended (8 messages)": 8,
-                "Maximum (12 messages)": 12
-            }
-            
-            selected_context = st.selectbox(
-                "Chat Context Level",
-                options=list(context_options.keys()),
-                index=1,  # Default to "Balanced"
-                help="How many recent messages to include as context for AI responses"
-            )
-            
-            # Store the selection in session state
-            st.session_state.app_state["context_limit"] = context_options[selected_context]
-            
-            # Auto-trim option
-            auto_trim = st.checkbox(
-                "Auto-trim long conversations", 
-                value=True,
-                help="Automatically manage conversation length to prevent token overflow"
-            )
-            st.session_state.app_state["auto_trim"] = auto_trim
-            
-            # Manual trim button for long conversations
-            if msg_count > 20:
-                if st.button("✂️ Trim Old Messages"):
-                    if st.session_state.get("confirm_trim", False):
-                        # Apply smart trimming
-                        st.session_state.app_state["messages"] = manage_conversation_length(
-                            st.session_state.app_state["messages"],
-                            max_messages=20,
-                            preserve_recent=10
-                        )
-                        st.session_state.confirm_trim = False
-                        st.success("✅ Conversation trimmed successfully!")
-                        st.rerun()
-                    else:
-                        st.session_state.confirm_trim = True
-                        st.warning("⚠️ Click again to confirm trimming")
-        else:
-            st.info("No messages yet. Start a conversation!")
-        
-        st.markdown("---")
-        
-        # Experience rating
-        st.markdown("### 🌟 Rate Your Experience")
-        st.slider("How helpful is Hawa Singh?", 1, 5, key="experience_rating")
-        
-        # Debug mode toggle
-        st.session_state.app_state["debug_mode"] = st.checkbox("🔧 Debug Mode", value=st.session_state.app_state.get("debug_mode", False))
-        
-        # Clear chat button with confirmation
-        if st.button("🗑️ Clear Chat History"):
-            if st.session_state.get("confirm_clear", False):
-                st.session_state.app_state["messages"] = []
-                model = genai.GenerativeModel(config.MODEL_NAME)
-                st.session_state.app_state["chat"] = model.start_chat(history=[])
-                st.session_state.confirm_clear = False
-                st.rerun()
-            else:
-                st.session_state.confirm_clear = True
-                st.warning("Click again to confirm clearing chat history")
-        
-        if st.session_state.app_state["debug_mode"]:
-            st.text("Debug Info:")
-            st.text(f"Initialized: {st.session_state.app_state['initialized']}")
-            st.text(f"Messages: {len(st.session_state.app_state['messages'])}")
-            st.text(f"Retriever: {st.session_state.app_state['retriever'] is not None}")
-            st.text(f"Chat: {st.session_state.app_state['chat'] is not None}")
-            
-            # Add profile debug information
-            profile = st.session_state.app_state["user_profile"]
-            st.text("User Profile Debug:")
-            st.text(f"  Name: {profile.get('name', 'None')}")
-            st.text(f"  Channel: {profile.get('channel_name', 'None')}")
-            st.text(f"  Age: {profile.get('age', 'None')}")
-            st.text(f"  Location: {profile.get('location', 'None')}")
-            st.text(f"  Content Type: {profile.get('content_type', 'None')}")
-            st.text(f"  Subscribers: {profile.get('subscriber_count', 'None')}")
-            
-            # Add token usage information
-            if st.session_state.app_state["chat"]:
-                try:
-                    # Estimate token usage (rough calculation)
-                    total_chars = sum(len(msg["content"]) for msg in st.session_state.app_state["messages"])
-                    estimated_tokens = total_chars // 4  # Rough estimate: 4 chars per token
-                    st.text(f"Estimated Tokens: ~{estimated_tokens}")
-                    st.text(f"Chat History Length: {len(st.session_state.app_state['chat'].history)}")
-                    
-                    # Show configurable chat history in debug
-                    if len(st.session_state.app_state["messages"]) > 0:
-                        # Smart preview limit based on conversation length
-                        if len(st.session_state.app_state["messages"]) <= 4:
-                            preview_limit = len(st.session_state.app_state["messages"])
-                        elif len(st.session_state.app_state["messages"]) <= 10:
-                            preview_limit = 6
-                        else:
-                            preview_limit = 8
-                        
-                        with st.expander(f"🔍 Recent Chat Context (Last {preview_limit} Messages)", expanded=False):
-                            recent_messages = st.session_state.app_state["messages"][-preview_limit:]
-                            for i, msg in enumerate(recent_messages):
-                                role_emoji = "🎯" if msg['role'] == "assistant" else "👤"
-                                content_preview = msg['content'][:150] + "..." if len(msg['content']) > 150 else msg['content']
-                                st.write(f"{role_emoji} **{msg['role'].title()}:** {content_preview}")
-                            
-                            # Show token usage for this preview
-                            preview_chars = sum(len(msg["content"]) for msg in recent_messages)
-                            preview_tokens = preview_chars // 4
-                            st.caption(f"Preview tokens: ~{preview_tokens} | Total conversation: ~{estimated_tokens}")
-                        
-                        # Add conversation management options
-                        if len(st.session_state.app_state["messages"]) > 20:
-                            st.warning(f"⚠️ Long conversation ({len(st.session_state.app_state['messages'])} messages). Consider clearing history to improve performance.")
-                            
-                except Exception as e:
-                    st.text(f"Token info error: {str(e)}")
-    
-    # Display chat history with enhanced styling
-    for message in st.session_state.app_state["messages"]:
-        if message["role"] == "assistant":
-            avatar = "🎯"
-            with st.chat_message(message["role"], avatar=avatar):
-                st.markdown(message["content"])
-        else:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        render_sidebar()
+    
+    # Display chat history with enhanced styling; older messages are only
+    # rendered inside a collapsed expander to keep reruns cheap
+    messages = st.session_state.app_state["messages"]
+    older_messages = messages[:-RECENT_MESSAGE_WINDOW]
+    if older_messages:
+        with st.expander(f"Show {len(older_messages)} older messages"):
+            render_messages(older_messages)
+    render_messages(messages[-RECENT_MESSAGE_WINDOW:])
     
     # Chat input with placeholder
     if prompt := st.chat_input("💭 Kya puchna chahte ho? (What would you like to ask?)"):
@@ -1531,11 +1609,12 @@ Keep it natural, warm, and under 25 words."""
                 preserve_recent=8
             )
         
-        # Extract and update user information
-        st.session_state.app_state["user_profile"] = extract_user_info(
-            prompt, 
-            st.session_state.app_state["user_profile"]
-        )
+        # Extract and update user information; a bare greeting carries none
+        if not is_bare_greeting(prompt):
+            st.session_state.app_state["user_profile"] = extract_user_info(
+                prompt, 
+                st.session_state.app_state["user_profile"]
+            )
         
         # Add user message to chat history
         st.session_state.app_state["messages"].append({"role": "user", "content": prompt})
@@ -1546,155 +1625,76 @@ Keep it natural, warm, and under 25 words."""
         with st.chat_message("assistant", avatar="🎯"):
             message_placeholder = st.empty()
             full_response = ""
+            debug = st.session_state.app_state["debug_mode"]
             
             try:
                 # Check for inappropriate content first
                 if is_inappropriate_content(prompt):
-                    if st.session_state.app_state["debug_mode"]:
+                    if debug:
                         st.write(f"🚫 Debug: Inappropriate content detected: '{prompt}'")
                     
                     # Use the system prompt for inappropriate content
                     system_prompt = get_system_prompt({}, prompt)
                     
                     with st.spinner("Hawa Singh is responding..."):
-                        response = st.session_state.app_state["chat"].send_message(system_prompt)
-                        full_response = clean_response_formatting(response.text)
-                        message_placeholder.markdown(full_response)
+                        response = st.session_state.app_state["chat"].send_message(system_prompt, stream=True)
+                    streamed = message_placeholder.write_stream(stream_response_text(response))
+                    full_response = clean_response_formatting(streamed)
+                    message_placeholder.markdown(full_response)
                 
                 else:
                     # Use AI to detect if it's a greeting or introduction
                     is_simple_greeting = is_greeting_or_introduction(prompt)
-                    
-                    # Debug info for greeting detection
-                    if st.session_state.app_state["debug_mode"]:
-                        st.write(f"🔍 Debug: is_simple_greeting = {is_simple_greeting}")
-                        if is_simple_greeting:
-                            response_type = get_greeting_response_type(prompt)
-                            st.write(f"🔍 Debug: response_type = {response_type}")
-                        
-                        # Add step-by-step detection debug
-                        is_step_question = is_step_by_step_question(prompt)
-                        st.write(f"🔍 Debug: is_step_by_step_question = {is_step_question}")
+                    debug_info = build_debug_info(prompt, is_simple_greeting) if debug else None
                     
                     if is_simple_greeting:
                         # Get the specific type of greeting response needed
                         response_type = get_greeting_response_type(prompt)
+                        if debug:
+                            render_debug_info(debug_info)
                         
-                        if response_type == "NAME_QUESTION":
-                            greeting_prompt = f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user asked: "{prompt}"
-
-Respond with a warm, natural introduction in Hinglish. Include your credentials.
-
-Example style:
-"Namaste! Main Hawa Singh hoon - YouTube growth expert with 500K+ subscribers. Aapki channel ki growth mein help karta hoon. Kya puchna chahte ho?"
-
-Keep it natural, warm, and under 30 words."""
+                        greeting_prompt = GREETING_TEMPLATES.get(
+                            response_type, GREETING_TEMPLATES["SIMPLE_GREETING"]
+                        ).format(query=prompt)
                         
-                        elif response_type == "INTRODUCTION":
-                            greeting_prompt = f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user introduced themselves: "{prompt}"
-
-Respond warmly, acknowledge their introduction, and introduce yourself naturally in Hinglish.
-
-Example style:
-"Nice to meet you! Main Hawa Singh hoon, YouTube expert with 500K+ subscribers. Aapki journey mein help karunga. Kya chahiye help?"
-
-Keep it natural, warm, and under 30 words."""
-                        
-                        else:  # SIMPLE_GREETING
-                            greeting_prompt = f"""You are Hawa Singh, a friendly YouTube Growth Expert who speaks in natural Hinglish.
-
-The user greeted you: "{prompt}"
-
-Respond with a warm, natural greeting back in Hinglish. Be friendly and inviting.
-
-Example style:
-"Namaste dost! Kaise ho? Main Hawa Singh - YouTube expert with 500K+ subscribers. Kya help chahiye aaj?"
-
-Keep it natural, warm, and under 30 words."""
-                        
-                        # Show typing indicator for greetings too
+                        # Show typing indicator until the first chunk arrives
                         with st.spinner("Hawa Singh is typing..."):
-                            response = st.session_state.app_state["chat"].send_message(greeting_prompt)
-                            full_response = clean_response_formatting(response.text)
-                            message_placeholder.markdown(full_response)
+                            response = st.session_state.app_state["chat"].send_message(greeting_prompt, stream=True)
+                        streamed = message_placeholder.write_stream(stream_response_text(response))
+                        full_response = clean_response_formatting(streamed)
+                        message_placeholder.markdown(full_response)
                     else:
                         # Get context from vector store for complex questions
                         context = st.session_state.app_state["retriever"].retrieve_context(prompt)
                         
                         # Show debug info about context retrieval
-                        if st.session_state.app_state["debug_mode"]:
-                            st.write(f"🔍 Debug: Context retrieval triggered for: '{prompt}'")
-                            st.write(f"📊 Debug: Retrieved {len(context['context']['chunks'])} chunks")
+                        if debug:
+                            debug_info["context_retrieval_for"] = prompt
+                            debug_info["retrieved_chunks"] = len(context['context']['chunks'])
+                            render_debug_info(debug_info)
                         
                         # Show debug info about chunks BEFORE generating response
-                        if st.session_state.app_state["debug_mode"]:
-                            with st.expander("🔍 Retrieved Context Chunks", expanded=True):
-                                for i, chunk in enumerate(context['context']['chunks']):
-                                    # Handle different chunk structures with better error handling
-                                    try:
-                                        score = chunk.get('score', chunk.get('similarity', 'N/A'))
-                                        content = chunk.get('content', chunk.get('text', str(chunk)))
-                                        
-                                        st.write(f"**Chunk {i+1}** (Score: {score})")
-                                        st.code(content)
-                                        st.markdown("---")
-                                    except Exception as chunk_error:
-                                        st.write(f"**Chunk {i+1}** (Error displaying chunk)")
-                                        st.code(f"Chunk data: {str(chunk)}")
-                                        st.markdown("---")
+                        render_context_chunks(context['context']['chunks'])
                         
                         # Prepare system prompt with context
                         system_prompt = get_system_prompt(context, prompt)
                         
-                        # Show typing indicator
+                        # Show typing indicator until the first chunk arrives
                         with st.spinner("Hawa Singh is typing..."):
                             # Get response using preserved chat history
-                            response = st.session_state.app_state["chat"].send_message(system_prompt)
-                            
-                            # Clean and format the response
-                            full_response = clean_response_formatting(response.text)
-                            
-                            # Stream response with proper formatting
-                            words = full_response.split()
-                            displayed_response = ""
-                            for word in words:
-                                displayed_response += word + " "
-                                time.sleep(0.03)
-                                message_placeholder.markdown(displayed_response + "▌")
-                                
-                            message_placeholder.markdown(full_response)
+                            response = st.session_state.app_state["chat"].send_message(system_prompt, stream=True)
+                        
+                        # Stream chunks as the model produces them
+                        streamed = message_placeholder.write_stream(stream_response_text(response))
+                        
+                        # Clean and format the complete response
+                        full_response = clean_response_formatting(streamed)
+                        message_placeholder.markdown(full_response)
             
             except Exception as e:
-                error_message = str(e)
-                if "429" in error_message:  # Rate limit error
-                    error_message = """🚫 I apologize, but I'm currently experiencing high traffic and have hit the API rate limit. 
-                    
-                    Please try:
-                    1. Waiting a minute before asking another question
-                    2. Making your question more specific and focused
-                    3. Coming back in a few minutes if the issue persists
-                    
-                    This is a temporary limitation and I'll be happy to help you once the rate limit resets!"""
-                elif "embedding" in error_message.lower():
-                    error_message = """🤔 I'm having trouble understanding your query. Could you try:
-                    
-                    1. Rephrasing your question
-                    2. Being more specific about what you want to know
-                    3. Using complete sentences
-                    
-                    This will help me provide a better response!"""
-                else:
-                    error_message = f"""⚠️ I encountered an issue while processing your request. 
-                    
-                    The specific error was: {error_message}
-                    
-                    Please try again in a moment."""
+                error_message = format_error_message(str(e))
                 
-                if st.session_state.app_state["debug_mode"]:
+                if debug:
                     st.error(f"Full error: {str(e)}")
                 
                 message_placeholder.markdown(error_message)
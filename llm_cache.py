@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import numpy as np
+import orjson
+
+# On-disk cache of parsed LLM responses, one JSON file per prompt
+CACHE_DIR = "data/.cache"
+
+def cache_key(model_name, prompt):
+    """Build a stable cache key from the model name and prompt"""
+    payload = json.dumps({"model": model_name, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def get(key):
+    """Return the cached value for a key, or None on a miss"""
+    try:
+        with open(_cache_path(key), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def put(key, value):
+    """Store a value atomically so readers never see a partial file"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(value))
+        os.replace(tmp_path, _cache_path(key))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class SemanticCache:
+    """Reuse cached values for inputs whose embeddings are near-duplicates"""
+    
+    def __init__(self, namespace, threshold=0.92, ttl_seconds=7 * 24 * 60 * 60):
+        # Namespace per prompt template version so stale templates never match
+        self.cache_dir = os.path.join(CACHE_DIR, "semantic", namespace)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._embeddings_path = os.path.join(self.cache_dir, "embeddings.npy")
+        self._keys_path = os.path.join(self.cache_dir, "keys.jsonl")
+        self._load()
+    
+    def _load(self):
+        self.embeddings = None
+        self.entries = []
+        try:
+            self.embeddings = np.load(self._embeddings_path)
+            with open(self._keys_path, 'r', encoding='utf-8') as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+        except (FileNotFoundError, ValueError):
+            self.embeddings = None
+            self.entries = []
+            return
+        
+        # Guard against a crash between the two writes
+        count = min(len(self.embeddings), len(self.entries))
+        self.embeddings = self.embeddings[:count]
+        self.entries = self.entries[:count]
+        self.norms = np.linalg.norm(self.embeddings, axis=1)
+    
+    def get(self, embedding):
+        """Return the value of the most similar fresh entry above the threshold"""
+        if self.embeddings is None or not self.entries:
+            return None
+        
+        query = np.asarray(embedding, dtype=np.float32)
+        sims = self.embeddings @ query / (self.norms * np.linalg.norm(query) + 1e-12)
+        
+        # Ignore entries older than the freshness window
+        now = time.time()
+        fresh = np.fromiter(
+            (now - entry["created"] <= self.ttl_seconds for entry in self.entries),
+            dtype=bool, count=len(self.entries)
+        )
+        sims = np.where(fresh, sims, -1.0)
+        
+        best = int(np.argmax(sims))
+        if sims[best] > self.threshold:
+            return self.entries[best]["value"]
+        return None
+    
+    def put(self, embedding, value):
+        """Append an entry and persist the cache"""
+        row = np.asarray(embedding, dtype=np.float32)[np.newaxis, :]
+        if self.embeddings is None:
+            self.embeddings = row
+        else:
+            self.embeddings = np.vstack([self.embeddings, row])
+        self.norms = np.linalg.norm(self.embeddings, axis=1)
+        self.entries.append({"created": time.time(), "value": value})
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".npy")
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, self.embeddings)
+        os.replace(tmp_path, self._embeddings_path)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"".join(orjson.dumps(entry) + b"\n" for entry in self.entries))
+        os.replace(tmp_path, self._keys_path)
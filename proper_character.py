@@ -1,13 +1,237 @@
 import os
-import json
+import asyncio
+import itertools
+import math
+import re
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import google.generativeai as genai
 import config
+import llm_cache
 
-# Configure Gemini
+# Configure Gemini; the SDK keeps one client (and channel) per service, so every
+# batch request reuses the same connection. Leave transport at its default: the
+# async client needs "grpc_asyncio" for generate_content_async streaming.
 genai.configure(api_key=config.GOOGLE_API_KEY)
 model = genai.GenerativeModel(config.MODEL_NAME)
 
-def analyze_transcript_batches():
+# Gemini calls are I/O-bound; cap how many batches are in flight at once
+MAX_CONCURRENT_BATCHES = 5
+LENGTH_BINS = 2
+
+# Completed batches are checkpointed so a crashed run can resume
+CHECKPOINT_FILE = "data/hawa_singh/.checkpoint.jsonl"
+
+# Near-duplicate batches reuse earlier insights; bump the version when the prompt changes
+BATCH_PROMPT_VERSION = "batch_insights_v3"
+batch_semantic_cache = llm_cache.SemanticCache(BATCH_PROMPT_VERSION)
+
+def _string_list(description):
+    return {"type": "array", "items": {"type": "string"}, "description": description}
+
+def _object(properties):
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+# Structured-output schemas; Gemini guarantees responses match these
+BATCH_INSIGHT_SCHEMA = _object({
+    "personality_traits": _string_list("Specific personality traits you observe with examples"),
+    "speaking_patterns": _string_list("How he speaks, structures thoughts, rhetorical techniques"),
+    "hindi_expressions": _string_list("Key Hindi phrases, idioms, or cultural expressions he uses"),
+    "values_demonstrated": _string_list("Core values, beliefs, or principles shown in this content"),
+    "expertise_shown": _string_list("Topics he demonstrates knowledge about"),
+    "communication_style": _string_list("How he connects with audience, storytelling approach"),
+    "emotional_patterns": _string_list("Emotions he expresses, energy levels, motivational techniques"),
+    "cultural_context": _string_list("Indian cultural references, traditional wisdom, regional elements"),
+    "unique_characteristics": _string_list("What makes him distinctively different from other speakers"),
+    "audience_connection": _string_list("How he relates to his audience, addressing techniques"),
+})
+
+INSIGHT_FIELDS = tuple(BATCH_INSIGHT_SCHEMA["properties"])
+INSIGHT_LABELS = {
+    "personality_traits": "Personality Traits",
+    "speaking_patterns": "Speaking Patterns",
+    "hindi_expressions": "Hindi Expressions",
+    "values_demonstrated": "Values Demonstrated",
+    "expertise_shown": "Expertise Areas",
+    "communication_style": "Communication Style",
+    "emotional_patterns": "Emotional Patterns",
+    "cultural_context": "Cultural Context",
+    "unique_characteristics": "Unique Characteristics",
+    "audience_connection": "Audience Connection",
+}
+
+CHARACTER_PROFILE_SCHEMA = _object({
+    "basic_info": _object({
+        "name": {"type": "string"},
+        "primary_specialty": {"type": "string", "description": "Main area of expertise"},
+        "secondary_specialties": _string_list("Other areas he covers"),
+        "target_audience": {"type": "string", "description": "Primary audience description"},
+    }),
+    "core_personality": _object({
+        "dominant_traits": _string_list("Top 5-6 most consistent personality traits"),
+        "character_strengths": _string_list("His key strengths as a person/speaker"),
+        "motivational_approach": _string_list("How he motivates and inspires others"),
+        "leadership_style": _string_list("How he leads and influences"),
+    }),
+    "communication_profile": _object({
+        "speaking_style": _string_list("Key elements of how he communicates"),
+        "rhetorical_techniques": _string_list("Specific techniques he uses"),
+        "storytelling_approach": _string_list("How he tells stories and gives examples"),
+        "question_patterns": _string_list("Types of questions he asks"),
+        "emphasis_methods": _string_list("How he emphasizes important points"),
+    }),
+    "language_and_expressions": _object({
+        "signature_hindi_phrases": _string_list("Most characteristic Hindi expressions"),
+        "cultural_idioms": _string_list("Traditional sayings or wisdom he uses"),
+        "motivational_catchphrases": _string_list("Key phrases that define his message"),
+        "addressing_style": _string_list("How he addresses his audience"),
+    }),
+    "values_and_beliefs": _object({
+        "core_values": _string_list("Fundamental values he consistently promotes"),
+        "life_philosophy": _string_list("His overall philosophy and worldview"),
+        "success_principles": _string_list("What he believes leads to success"),
+        "spiritual_elements": _string_list("Any spiritual or philosophical aspects"),
+    }),
+    "expertise_and_knowledge": _object({
+        "primary_topics": _string_list("Main subjects he's expert in"),
+        "knowledge_sources": _string_list("Where his wisdom comes from - experience, study, etc."),
+        "practical_advice_style": _string_list("How he gives actionable advice"),
+        "problem_solving_approach": _string_list("How he approaches challenges"),
+    }),
+    "emotional_and_energy_profile": _object({
+        "emotional_range": _string_list("Emotions he typically expresses"),
+        "energy_levels": _string_list("His typical energy and enthusiasm"),
+        "empathy_style": _string_list("How he shows understanding and connection"),
+        "inspirational_methods": _string_list("Specific ways he inspires others"),
+    }),
+    "cultural_and_background": _object({
+        "cultural_influences": _string_list("Indian/regional cultural elements"),
+        "traditional_wisdom": _string_list("Traditional concepts he references"),
+        "modern_perspective": _string_list("How he blends traditional and modern views"),
+        "social_context": _string_list("Understanding of his social/cultural background"),
+    }),
+    "unique_differentiators": _object({
+        "distinctive_qualities": _string_list("What makes him unique among speakers"),
+        "signature_approaches": _string_list("His unique methods or techniques"),
+        "memorable_characteristics": _string_list("What people remember about him"),
+        "brand_elements": _string_list("What defines his personal brand"),
+    }),
+    "response_generation_guide": _object({
+        "sentence_structure": _string_list("How he typically structures sentences"),
+        "paragraph_flow": _string_list("How he organizes thoughts"),
+        "example_usage": _string_list("How and when he uses examples"),
+        "question_integration": _string_list("How he integrates questions"),
+        "closing_style": _string_list("How he typically ends his messages"),
+    }),
+})
+
+# Low temperature keeps re-runs consistent (and cacheable); output caps bound decode time.
+# The full profile has ~40 lists, so it needs a much larger budget than one batch.
+ANALYSIS_TEMPERATURE = 0.2
+BATCH_MAX_OUTPUT_TOKENS = 1024
+PROFILE_MAX_OUTPUT_TOKENS = 4096
+
+BATCH_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json",
+    response_schema=BATCH_INSIGHT_SCHEMA,
+    temperature=ANALYSIS_TEMPERATURE,
+    max_output_tokens=BATCH_MAX_OUTPUT_TOKENS
+)
+PROFILE_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json",
+    response_schema=CHARACTER_PROFILE_SCHEMA,
+    temperature=ANALYSIS_TEMPERATURE,
+    max_output_tokens=PROFILE_MAX_OUTPUT_TOKENS
+)
+
+# Aggregated insights closer than this (cosine) are treated as the same point
+NEAR_DUPLICATE_THRESHOLD = 0.9
+EMBED_BATCH_SIZE = 100
+
+BATCH_SHAPE_REMINDER = "\nREMINDER: all values must be JSON arrays of strings."
+
+def is_valid_batch_insight(batch):
+    """Check that every insight field is present and is a list of strings"""
+    if not isinstance(batch, dict):
+        return False
+    return all(
+        isinstance(batch.get(field), list) and all(isinstance(item, str) for item in batch[field])
+        for field in INSIGHT_FIELDS
+    )
+
+# Shared instructions for every batch; the transcript text follows the ===DYNAMIC=== marker
+BATCH_INSTRUCTIONS = """
+Analyze the content from Hawa Singh below the ===DYNAMIC=== marker for detailed character insights.
+
+Extract detailed character insights for every field in the response schema.
+
+Be specific and detailed. Look for:
+- Authentic personality traits that come through consistently
+- Cultural expressions that show his background
+- Unique speaking patterns and rhetorical devices
+- Values and beliefs he promotes
+- How he motivates and connects with people
+- Traditional wisdom mixed with modern perspectives
+""".strip()
+
+# Gemini sometimes wraps JSON in ```json fences
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
+
+def parse_json(text):
+    """Parse a model response as JSON, tolerating markdown code fences"""
+    return orjson.loads(_FENCE.sub("", text.strip()))
+
+def json_balanced(text):
+    """Check whether the first top-level JSON object or array in text has closed"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return True
+    return False
+
+async def generate_json_async(prompt, generation_config):
+    """Stream a JSON response and stop reading once the top-level value closes"""
+    response = await model.generate_content_async(
+        prompt, generation_config=generation_config, stream=True
+    )
+    text = ""
+    async for chunk in response:
+        if chunk.parts:
+            text += chunk.text
+            if json_balanced(text):
+                break
+    return parse_json(text)
+
+def generate_json(prompt, generation_config):
+    """Synchronous counterpart of generate_json_async"""
+    response = model.generate_content(
+        prompt, generation_config=generation_config, stream=True
+    )
+    text = ""
+    for chunk in response:
+        if chunk.parts:
+            text += chunk.text
+            if json_balanced(text):
+                break
+    return parse_json(text)
+
+async def analyze_transcript_batches():
     """Analyze transcripts in manageable batches for comprehensive character analysis"""
     
     print("🔍 Analyzing transcripts for proper character reference...")
@@ -15,144 +239,244 @@ def analyze_transcript_batches():
     hindi_folder = "hindi_transcripts"
     english_folder = "english_transcripts"
     
-    # Get all files
-    hindi_files = [f for f in os.listdir(hindi_folder) if f.endswith('.txt')] if os.path.exists(hindi_folder) else []
-    english_files = [f for f in os.listdir(english_folder) if f.endswith('.txt')] if os.path.exists(english_folder) else []
-    
-    print(f"📄 Found {len(hindi_files)} Hindi files and {len(english_files)} English files")
-    
-    character_insights = []
-    batch_count = min(10, max(len(hindi_files), len(english_files)))  # Process up to 10 files
-    
-    for i in range(batch_count):
-        print(f"\n📊 Analyzing batch {i+1}/{batch_count}")
-        
-        # Get content for this batch
-        hindi_content = ""
-        english_content = ""
-        
-        if i < len(hindi_files):
-            hindi_path = os.path.join(hindi_folder, hindi_files[i])
-            try:
-                with open(hindi_path, 'r', encoding='utf-8') as f:
-                    hindi_content = f.read()[:2500]  # Limit to 2500 chars
-                print(f"   📄 Hindi: {hindi_files[i]} ({len(hindi_content)} chars)")
-            except Exception as e:
-                print(f"   ❌ Error reading Hindi file: {e}")
+    # Get all files, sorted so batches are stable across runs
+    def list_transcripts(folder):
+        if not os.path.isdir(folder):
+            return []
+        with os.scandir(folder) as entries:
+            return sorted((e for e in entries if e.name.endswith('.txt')), key=lambda e: e.name)
+    
+    hindi_entries = list_transcripts(hindi_folder)
+    english_entries = list_transcripts(english_folder)
+    
+    print(f"📄 Found {len(hindi_entries)} Hindi files and {len(english_entries)} English files")
+    
+    batch_count = min(10, max(len(hindi_entries), len(english_entries)))  # Process up to 10 files
+    pairs = list(itertools.zip_longest(hindi_entries, english_entries))[:batch_count]
+    
+    # Each batch reads its files and calls Gemini in one coroutine, so disk reads
+    # overlap with requests that are already in flight
+    completed = load_checkpoint()
+    if completed:
+        print(f"📌 Found checkpoint with {len(completed)} completed batches")
+    
+    async def run_batch(batch_num, hindi_entry, english_entry, semaphore):
+        files = [entry.name if entry is not None else None for entry in (hindi_entry, english_entry)]
+        record = completed.get(batch_num)
+        if record and record["files"] == files:
+            print(f"   📌 Batch {batch_num}: resumed from checkpoint")
+            return record["payload"]
         
-        if i < len(english_files):
-            english_path = os.path.join(english_folder, english_files[i])
-            try:
-                with open(english_path, 'r', encoding='utf-8') as f:
-                    english_content = f.read()[:2500]  # Limit to 2500 chars
-                print(f"   📄 English: {english_files[i]} ({len(english_content)} chars)")
-            except Exception as e:
-                print(f"   ❌ Error reading English file: {e}")
+        hindi_content, english_content = await asyncio.gather(
+            asyncio.to_thread(read_transcript, hindi_entry, "Hindi"),
+            asyncio.to_thread(read_transcript, english_entry, "English")
+        )
+        if not (hindi_content or english_content):
+            print(f"   ⏭️ Batch {batch_num}: no readable content")
+            return None
         
-        # Analyze this batch
-        if hindi_content or english_content:
-            batch_analysis = analyze_single_batch(hindi_content, english_content, i+1)
-            if batch_analysis:
-                character_insights.append(batch_analysis)
-                print(f"   ✅ Character insights extracted")
-            else:
-                print(f"   ❌ Failed to extract insights")
+        async with semaphore:
+            batch_analysis = await analyze_single_batch(hindi_content, english_content, batch_num)
+        if batch_analysis:
+            save_checkpoint(batch_num, files, batch_analysis)
+        return batch_analysis
+    
+    # Group similar-sized batches into bins with their own concurrency slots, so
+    # short calls don't queue behind long ones
+    order = sorted(range(len(pairs)), key=lambda i: estimated_batch_size(pairs[i]))
+    bin_size = max(1, math.ceil(len(order) / LENGTH_BINS))
+    bins = [order[start:start + bin_size] for start in range(0, len(order), bin_size)]
+    bin_limits = [
+        max(1, MAX_CONCURRENT_BATCHES // len(bins) + (1 if k < MAX_CONCURRENT_BATCHES % len(bins) else 0))
+        for k in range(len(bins))
+    ]
+    
+    async def run_bin(indices, limit):
+        semaphore = asyncio.Semaphore(limit)
+        return await asyncio.gather(
+            *(run_batch(i+1, *pairs[i], semaphore) for i in indices),
+            return_exceptions=True
+        )
+    
+    print(f"\n🚀 Analyzing {batch_count} batches in {len(bins)} length bins (up to {MAX_CONCURRENT_BATCHES} at a time)...")
+    bin_results = await asyncio.gather(
+        *(run_bin(indices, limit) for indices, limit in zip(bins, bin_limits))
+    )
+    
+    results = [None] * len(pairs)
+    for indices, outcomes in zip(bins, bin_results):
+        for i, outcome in zip(indices, outcomes):
+            results[i] = outcome
+    
+    character_insights = []
+    for batch_num, batch_analysis in enumerate(results, start=1):
+        if isinstance(batch_analysis, Exception):
+            print(f"   ❌ Batch {batch_num}: {batch_analysis}")
+        elif batch_analysis:
+            character_insights.append(batch_analysis)
+            print(f"   ✅ Batch {batch_num}: character insights extracted")
     
     return character_insights
 
-def analyze_single_batch(hindi_text, english_text, batch_num):
-    """Analyze a single batch for detailed character insights"""
-    
-    prompt = f"""
-    Analyze this content from Hawa Singh (Video/Content {batch_num}) for detailed character insights.
-    
-    HINDI CONTENT:
-    {hindi_text}
-    
-    ENGLISH CONTENT:
-    {english_text}
-    
-    Extract detailed character insights in JSON format:
-    
-    {{
-        "personality_traits": [
-            "Specific personality traits you observe with examples"
-        ],
-        "speaking_patterns": [
-            "How he speaks, structures thoughts, rhetorical techniques"
-        ],
-        "hindi_expressions": [
-            "Key Hindi phrases, idioms, or cultural expressions he uses"
-        ],
-        "values_demonstrated": [
-            "Core values, beliefs, or principles shown in this content"
-        ],
-        "expertise_shown": [
-            "Topics he demonstrates knowledge about"
-        ],
-        "communication_style": [
-            "How he connects with audience, storytelling approach"
-        ],
-        "emotional_patterns": [
-            "Emotions he expresses, energy levels, motivational techniques"
-        ],
-        "cultural_context": [
-            "Indian cultural references, traditional wisdom, regional elements"
-        ],
-        "unique_characteristics": [
-            "What makes him distinctively different from other speakers"
-        ],
-        "audience_connection": [
-            "How he relates to his audience, addressing techniques"
-        ]
-    }}
+def load_checkpoint():
+    """Load completed batch analyses from an earlier interrupted run"""
+    completed = {}
+    try:
+        with open(CHECKPOINT_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # Partially written line from a crash
+                completed[record["batch"]] = record
+    except FileNotFoundError:
+        pass
+    return completed
+
+def save_checkpoint(batch_num, files, payload):
+    """Durably append one completed batch to the checkpoint file"""
+    os.makedirs(os.path.dirname(CHECKPOINT_FILE), exist_ok=True)
+    with open(CHECKPOINT_FILE, 'ab') as f:
+        f.write(orjson.dumps({"batch": batch_num, "files": files, "payload": payload}) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def clear_checkpoint():
+    """Remove the checkpoint once the character reference has been saved"""
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+def estimated_batch_size(pair):
+    """Approximate how much transcript text a batch will send, from file sizes"""
+    # Devanagari takes up to 3 bytes per character in UTF-8
+    return sum(min(entry.stat().st_size, 2500 * 3) for entry in pair if entry is not None)
+
+def read_transcript(entry, label):
+    """Read the start of a transcript file, or return an empty string if it can't be read"""
+    if entry is None:
+        return ""
     
-    Be specific and detailed. Look for:
-    - Authentic personality traits that come through consistently
-    - Cultural expressions that show his background
-    - Unique speaking patterns and rhetorical devices
-    - Values and beliefs he promotes
-    - How he motivates and connects with people
-    - Traditional wisdom mixed with modern perspectives
+    try:
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            content = f.read(2500)  # Limit to 2500 chars
+        print(f"   📄 {label}: {entry.name} ({len(content)} chars)")
+        return content
+    except Exception as e:
+        print(f"   ❌ Error reading {label} file: {e}")
+        return ""
+
+async def analyze_single_batch(hindi_text, english_text, batch_num):
+    """Analyze a single batch for detailed character insights"""
     
-    Respond ONLY with valid JSON.
-    """
+    # Static instructions first, so every batch shares the same prompt prefix
+    prompt = (
+        f"{BATCH_INSTRUCTIONS}\n"
+        f"===DYNAMIC===\n"
+        f"VIDEO/CONTENT: {batch_num}\n"
+        f"HINDI:\n{hindi_text}\n"
+        f"ENGLISH:\n{english_text}\n"
+    )
+    
+    key = llm_cache.cache_key(config.MODEL_NAME, prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        print(f"   ♻️ Batch {batch_num}: using cached analysis")
+        return cached
+    
+    batch_embedding = None
+    try:
+        embedding_result = await asyncio.to_thread(
+            genai.embed_content,
+            model=config.EMBEDDING_MODEL,
+            content=f"{hindi_text}\n{english_text}"
+        )
+        batch_embedding = embedding_result["embedding"]
+        similar = batch_semantic_cache.get(batch_embedding)
+        if similar is not None:
+            print(f"   ♻️ Batch {batch_num}: reusing analysis of a near-identical batch")
+            return similar
+    except Exception as e:
+        print(f"   ⚠️ Batch {batch_num} embedding error, skipping semantic cache: {e}")
     
     try:
-        response = model.generate_content(prompt)
-        return json.loads(response.text.strip())
+        parsed = await generate_json_async(prompt, BATCH_GENERATION_CONFIG)
+        if not is_valid_batch_insight(parsed):
+            # Retry once with an explicit reminder before giving up on this batch
+            print(f"   ⚠️ Batch {batch_num}: malformed insights, retrying once")
+            parsed = await generate_json_async(prompt + BATCH_SHAPE_REMINDER, BATCH_GENERATION_CONFIG)
+            if not is_valid_batch_insight(parsed):
+                print(f"   ❌ Batch {batch_num}: insights still malformed after retry")
+                return None
+        llm_cache.put(key, parsed)
+        if batch_embedding is not None:
+            batch_semantic_cache.put(batch_embedding, parsed)
+        return parsed
     except Exception as e:
-        print(f"   ❌ Batch analysis error: {e}")
+        print(f"   ❌ Batch {batch_num} analysis error: {e}")
         return None
 
+def unique_insights(items):
+    """Drop blank and repeated insights, keeping first-seen order"""
+    return list(dict.fromkeys(
+        item.strip() for item in items if isinstance(item, str) and item.strip()
+    ))
+
+def merge_near_duplicates(groups):
+    """Collapse near-identical insights within each group to their shortest phrasing"""
+    texts = [text for items in groups for text in items]
+    if not texts:
+        return groups
+    
+    try:
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            result = genai.embed_content(
+                model=config.EMBEDDING_MODEL,
+                content=texts[start:start + EMBED_BATCH_SIZE]
+            )
+            vectors.extend(result["embedding"])
+    except Exception as e:
+        print(f"⚠️ Embedding error, skipping near-duplicate merge: {e}")
+        return groups
+    
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    
+    merged = []
+    offset = 0
+    for items in groups:
+        group_vectors = vectors[offset:offset + len(items)]
+        offset += len(items)
+        sims = group_vectors @ group_vectors.T
+        
+        # Greedily attach each insight to the first earlier cluster it closely matches
+        clusters = []
+        for i, item in enumerate(items):
+            for anchor, members in clusters:
+                if sims[i, anchor] > NEAR_DUPLICATE_THRESHOLD:
+                    members.append(item)
+                    break
+            else:
+                clusters.append((i, [item]))
+        merged.append([min(members, key=len) for _, members in clusters])
+    
+    return merged
+
 def create_comprehensive_character_profile(all_insights):
     """Create a comprehensive character reference from all batch insights"""
     
     print("🎭 Creating comprehensive character reference...")
     
     # Aggregate all insights
-    all_traits = []
-    all_patterns = []
-    all_expressions = []
-    all_values = []
-    all_expertise = []
-    all_communication = []
-    all_emotions = []
-    all_cultural = []
-    all_unique = []
-    all_audience = []
-    
+    buckets = {field: [] for field in INSIGHT_FIELDS}
     for batch in all_insights:
-        all_traits.extend(batch.get('personality_traits', []))
-        all_patterns.extend(batch.get('speaking_patterns', []))
-        all_expressions.extend(batch.get('hindi_expressions', []))
-        all_values.extend(batch.get('values_demonstrated', []))
-        all_expertise.extend(batch.get('expertise_shown', []))
-        all_communication.extend(batch.get('communication_style', []))
-        all_emotions.extend(batch.get('emotional_patterns', []))
-        all_cultural.extend(batch.get('cultural_context', []))
-        all_unique.extend(batch.get('unique_characteristics', []))
-        all_audience.extend(batch.get('audience_connection', []))
+        for field in INSIGHT_FIELDS:
+            buckets[field].extend(batch.get(field, []))
+    
+    # Batches repeat each other a lot; send each insight to the model only once
+    merged = merge_near_duplicates([unique_insights(buckets[field]) for field in INSIGHT_FIELDS])
+    buckets = dict(zip(INSIGHT_FIELDS, merged))
+    aggregated = "\n    ".join(f"{INSIGHT_LABELS[field]}: {buckets[field]}" for field in INSIGHT_FIELDS)
     
     # Create comprehensive analysis prompt
     synthesis_prompt = f"""
@@ -160,83 +484,9 @@ def create_comprehensive_character_profile(all_insights):
     
     AGGREGATED INSIGHTS:
     
-    Personality Traits: {all_traits}
-    Speaking Patterns: {all_patterns}
-    Hindi Expressions: {all_expressions}
-    Values Demonstrated: {all_values}
-    Expertise Areas: {all_expertise}
-    Communication Style: {all_communication}
-    Emotional Patterns: {all_emotions}
-    Cultural Context: {all_cultural}
-    Unique Characteristics: {all_unique}
-    Audience Connection: {all_audience}
-    
-    Create a comprehensive character reference in JSON format:
-    
-    {{
-        "basic_info": {{
-            "name": "Hawa Singh",
-            "primary_specialty": "Main area of expertise",
-            "secondary_specialties": ["Other areas he covers"],
-            "target_audience": "Primary audience description"
-        }},
-        "core_personality": {{
-            "dominant_traits": ["Top 5-6 most consistent personality traits"],
-            "character_strengths": ["His key strengths as a person/speaker"],
-            "motivational_approach": ["How he motivates and inspires others"],
-            "leadership_style": ["How he leads and influences"]
-        }},
-        "communication_profile": {{
-            "speaking_style": ["Key elements of how he communicates"],
-            "rhetorical_techniques": ["Specific techniques he uses"],
-            "storytelling_approach": ["How he tells stories and gives examples"],
-            "question_patterns": ["Types of questions he asks"],
-            "emphasis_methods": ["How he emphasizes important points"]
-        }},
-        "language_and_expressions": {{
-            "signature_hindi_phrases": ["Most characteristic Hindi expressions"],
-            "cultural_idioms": ["Traditional sayings or wisdom he uses"],
-            "motivational_catchphrases": ["Key phrases that define his message"],
-            "addressing_style": ["How he addresses his audience"]
-        }},
-        "values_and_beliefs": {{
-            "core_values": ["Fundamental values he consistently promotes"],
-            "life_philosophy": ["His overall philosophy and worldview"],
-            "success_principles": ["What he believes leads to success"],
-            "spiritual_elements": ["Any spiritual or philosophical aspects"]
-        }},
-        "expertise_and_knowledge": {{
-            "primary_topics": ["Main subjects he's expert in"],
-            "knowledge_sources": ["Where his wisdom comes from - experience, study, etc."],
-            "practical_advice_style": ["How he gives actionable advice"],
-            "problem_solving_approach": ["How he approaches challenges"]
-        }},
-        "emotional_and_energy_profile": {{
-            "emotional_range": ["Emotions he typically expresses"],
-            "energy_levels": ["His typical energy and enthusiasm"],
-            "empathy_style": ["How he shows understanding and connection"],
-            "inspirational_methods": ["Specific ways he inspires others"]
-        }},
-        "cultural_and_background": {{
-            "cultural_influences": ["Indian/regional cultural elements"],
-            "traditional_wisdom": ["Traditional concepts he references"],
-            "modern_perspective": ["How he blends traditional and modern views"],
-            "social_context": ["Understanding of his social/cultural background"]
-        }},
-        "unique_differentiators": {{
-            "distinctive_qualities": ["What makes him unique among speakers"],
-            "signature_approaches": ["His unique methods or techniques"],
-            "memorable_characteristics": ["What people remember about him"],
-            "brand_elements": ["What defines his personal brand"]
-        }},
-        "response_generation_guide": {{
-            "sentence_structure": ["How he typically structures sentences"],
-            "paragraph_flow": ["How he organizes thoughts"],
-            "example_usage": ["How and when he uses examples"],
-            "question_integration": ["How he integrates questions"],
-            "closing_style": ["How he typically ends his messages"]
-        }}
-    }}
+    {aggregated}
+    
+    Create a comprehensive character reference that fills every field in the response schema.
     
     Guidelines:
     - Focus on consistent patterns across all content
@@ -247,17 +497,29 @@ def create_comprehensive_character_profile(all_insights):
     - Capture his unique voice and perspective
     
     This will be used to generate authentic responses in his voice, so be comprehensive and specific.
-    
-    Respond ONLY with valid JSON.
     """
     
+    key = llm_cache.cache_key(config.MODEL_NAME, synthesis_prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        print("♻️ Using cached character synthesis")
+        return cached
+    
     try:
-        response = model.generate_content(synthesis_prompt)
-        return json.loads(response.text.strip())
+        parsed = generate_json(synthesis_prompt, PROFILE_GENERATION_CONFIG)
+        # The name is known up front; don't trust the model to echo it back
+        parsed.setdefault('basic_info', {})['name'] = "Hawa Singh"
+        llm_cache.put(key, parsed)
+        return parsed
     except Exception as e:
         print(f"❌ Character synthesis error: {e}")
         return None
 
+def write_output_file(path, data):
+    """Write precomputed bytes to a file in one call"""
+    with open(path, 'wb') as f:
+        f.write(data)
+
 def save_character_reference(character_profile):
     """Save the comprehensive character reference"""
     
@@ -266,69 +528,59 @@ def save_character_reference(character_profile):
     # Create hawa_singh folder
     os.makedirs("data/hawa_singh", exist_ok=True)
     
-    # Save complete character reference
+    # Complete character reference
     reference_file = "data/hawa_singh/character_reference.json"
-    with open(reference_file, 'w', encoding='utf-8') as f:
-        json.dump(character_profile, f, indent=2, ensure_ascii=False)
+    reference_json = orjson.dumps(character_profile, option=orjson.OPT_INDENT_2)
     
-    # Save readable character guide
+    # Readable character guide
     guide_file = "data/hawa_singh/character_guide.txt"
-    with open(guide_file, 'w', encoding='utf-8') as f:
-        f.write("HAWA SINGH - COMPREHENSIVE CHARACTER REFERENCE\n")
-        f.write("=" * 60 + "\n\n")
-        
-        # Basic Info
-        f.write("BASIC INFORMATION:\n")
-        f.write(f"Name: {character_profile['basic_info']['name']}\n")
-        f.write(f"Primary Specialty: {character_profile['basic_info']['primary_specialty']}\n")
-        f.write(f"Target Audience: {character_profile['basic_info']['target_audience']}\n\n")
-        
-        # Core Personality
-        f.write("CORE PERSONALITY:\n")
-        for trait in character_profile['core_personality']['dominant_traits']:
-            f.write(f"• {trait}\n")
-        f.write("\n")
-        
-        # Communication Profile
-        f.write("COMMUNICATION STYLE:\n")
-        for style in character_profile['communication_profile']['speaking_style']:
-            f.write(f"• {style}\n")
-        f.write("\n")
-        
-        # Signature Phrases
-        f.write("SIGNATURE HINDI PHRASES:\n")
-        for phrase in character_profile['language_and_expressions']['signature_hindi_phrases']:
-            f.write(f"• {phrase}\n")
-        f.write("\n")
-        
-        # Core Values
-        f.write("CORE VALUES:\n")
-        for value in character_profile['values_and_beliefs']['core_values']:
-            f.write(f"• {value}\n")
-        f.write("\n")
-        
-        # Unique Qualities
-        f.write("UNIQUE DIFFERENTIATORS:\n")
-        for quality in character_profile['unique_differentiators']['distinctive_qualities']:
-            f.write(f"• {quality}\n")
-        f.write("\n")
-        
-        # Response Guide
-        f.write("RESPONSE GENERATION GUIDE:\n")
-        for guide in character_profile['response_generation_guide']['sentence_structure']:
-            f.write(f"• {guide}\n")
-    
-    # Create config entry
+    basic_info = character_profile['basic_info']
+    parts = [
+        "HAWA SINGH - COMPREHENSIVE CHARACTER REFERENCE\n",
+        "=" * 60 + "\n\n",
+        "BASIC INFORMATION:\n",
+        f"Name: {basic_info['name']}\n",
+        f"Primary Specialty: {basic_info['primary_specialty']}\n",
+        f"Target Audience: {basic_info['target_audience']}\n\n",
+    ]
+    
+    guide_sections = [
+        ("CORE PERSONALITY", character_profile['core_personality']['dominant_traits']),
+        ("COMMUNICATION STYLE", character_profile['communication_profile']['speaking_style']),
+        ("SIGNATURE HINDI PHRASES", character_profile['language_and_expressions']['signature_hindi_phrases']),
+        ("CORE VALUES", character_profile['values_and_beliefs']['core_values']),
+        ("UNIQUE DIFFERENTIATORS", character_profile['unique_differentiators']['distinctive_qualities']),
+        ("RESPONSE GENERATION GUIDE", character_profile['response_generation_guide']['sentence_structure']),
+    ]
+    for index, (heading, items) in enumerate(guide_sections):
+        if index:
+            parts.append("\n")
+        parts.append(f"{heading}:\n")
+        parts.extend(f"• {item}\n" for item in items)
+    
+    guide_text = "".join(parts)
+    
+    # Config entry
     config_file = "data/hawa_singh/config_entry.txt"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        personality_summary = ", ".join(character_profile['core_personality']['dominant_traits'][:3])
-        
-        f.write("Add this to your config.py CREATORS section:\n\n")
-        f.write(f'"hawa_singh": {{\n')
-        f.write(f'    "name": "{character_profile["basic_info"]["name"]}",\n')
-        f.write(f'    "specialty": "{character_profile["basic_info"]["primary_specialty"]}",\n')
-        f.write(f'    "personality": "{personality_summary}"\n')
-        f.write(f'}},\n')
+    personality_summary = ", ".join(character_profile['core_personality']['dominant_traits'][:3])
+    config_entry = (
+        "Add this to your config.py CREATORS section:\n\n"
+        '"hawa_singh": {\n'
+        f'    "name": "{basic_info["name"]}",\n'
+        f'    "specialty": "{basic_info["primary_specialty"]}",\n'
+        f'    "personality": "{personality_summary}"\n'
+        '},\n'
+    )
+    
+    # Contents are fully built; write the independent files in parallel
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        writes = [
+            executor.submit(write_output_file, reference_file, reference_json),
+            executor.submit(write_output_file, guide_file, guide_text.encode('utf-8')),
+            executor.submit(write_output_file, config_file, config_entry.encode('utf-8')),
+        ]
+        for write in writes:
+            write.result()  # Surface any write error
     
     print(f"✅ Character reference saved to: {reference_file}")
     print(f"✅ Character guide saved to: {guide_file}")
@@ -369,7 +621,7 @@ def main():
     print("=" * 60)
     
     # Step 1: Analyze transcripts in batches
-    character_insights = analyze_transcript_batches()
+    character_insights = asyncio.run(analyze_transcript_batches())
     
     if not character_insights:
         print("❌ No character insights extracted!")
@@ -386,6 +638,7 @@ def main():
     
     # Step 3: Save character reference
     save_character_reference(character_profile)
+    clear_checkpoint()
     
     # Step 4: Display summary
     display_character_summary(character_profile)
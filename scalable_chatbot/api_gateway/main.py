@@ -1,12 +1,22 @@
 from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
 import httpx
-import redis
+import orjson
+from redis import asyncio as aioredis
 import logging
 import time
 import json
-from typing import Dict, Any, Optional
+import math
+import itertools
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+from cachetools import TLRUCache
 from shared.models import ChatRequest, ChatResponse
 from config.settings import settings
 
@@ -17,11 +27,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage the shared downstream HTTP client for the gateway's lifetime"""
+    # One pooled client for all proxied calls so connections are kept alive and reused
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+        timeout=httpx.Timeout(30.0)
+    )
+    
+    await startup_event()
+    
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+        await redis_pool.disconnect()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Creator Chatbot API Gateway",
     description="API Gateway for scalable creator chatbot microservices",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,14 +62,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Redis for caching and rate limiting
-redis_client = redis.Redis(
+# Initialize Redis for caching and rate limiting; async so calls never block the event loop
+redis_pool = aioredis.ConnectionPool(
     host=settings.redis.host,
     port=settings.redis.port,
     db=settings.redis.db,
     password=settings.redis.password,
+    max_connections=100,
     decode_responses=True
 )
+redis_client = aioredis.Redis(connection_pool=redis_pool)
 
 # Security
 security = HTTPBearer(auto_error=False)
@@ -60,25 +91,57 @@ class LoadBalancer:
                 "http://retrieval-service-2:8003"
             ]
         }
-        self.current_index = {service: 0 for service in self.service_instances}
+        # One endless round-robin iterator per service; next() is atomic on the event loop
+        self._cycles = {
+            service: itertools.cycle(urls)
+            for service, urls in self.service_instances.items()
+        }
     
     def get_service_url(self, service_name: str) -> str:
         """Get next available service instance URL"""
-        if service_name not in self.service_instances:
-            # Fallback to settings
-            return settings.get_service_url(service_name)
-        
-        instances = self.service_instances[service_name]
-        current_idx = self.current_index[service_name]
-        
-        # Round-robin selection
-        url = instances[current_idx]
-        self.current_index[service_name] = (current_idx + 1) % len(instances)
-        
-        return url
+        cycle = self._cycles.get(service_name)
+        if cycle is None:
+            # Fallback to settings, cached as a single-instance cycle
+            cycle = self._cycles[service_name] = itertools.cycle([settings.get_service_url(service_name)])
+        return next(cycle)
 
 load_balancer = LoadBalancer()
 
+# Sliding-window log in a single round trip: drop hits older than the window, admit
+# the request if there is room, and report {allowed, remaining, reset_ms} atomically.
+# ARGV: now_ms, window_ms, limit, unique request id, backlog of hits already admitted locally
+RATE_LIMIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local backlog = tonumber(ARGV[5] or '0')
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+for i = 1, backlog do
+    redis.call('ZADD', KEYS[1], now, ARGV[1] .. ':' .. ARGV[4] .. ':' .. i)
+end
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[1] .. ':' .. ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window + 10000)
+    count = count + 1
+    allowed = 1
+end
+local reset_ms = window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset_ms = tonumber(oldest[2]) + window - now
+end
+return {allowed, math.max(limit - count, 0), reset_ms}
+"""
+
+# Enterprise limits are loose, so their hits are counted in-process and only synced
+# to Redis every N requests or T seconds, whichever comes first
+ENTERPRISE_SYNC_EVERY = 50
+ENTERPRISE_SYNC_SECONDS = 30
+# Upper bound on in-process rate limit entries; expired ones are evicted first
+RATE_LIMIT_LOCAL_MAXSIZE = 100_000
+
 class RateLimiter:
     """Advanced rate limiting with different tiers"""
     
@@ -88,28 +151,73 @@ class RateLimiter:
             "premium": {"requests": 500, "window": 3600},   # 500/hour
             "enterprise": {"requests": 5000, "window": 3600} # 5000/hour
         }
+        # redis-py runs this via EVALSHA and reloads it on NoScriptError
+        self.script = redis_client.register_script(RATE_LIMIT_SCRIPT)
+        # Over-limit keys -> time their window frees up; rejects them without a Redis call.
+        # Each entry expires at its own deny time, so users who never return do not pile up.
+        self._deny_until: TLRUCache = TLRUCache(
+            maxsize=RATE_LIMIT_LOCAL_MAXSIZE,
+            ttu=lambda key, deny_until, now: deny_until,
+            timer=time.time
+        )
+        # Enterprise keys -> (unsynced hits, last sync time, remaining at sync, reset time),
+        # expiring when the window resets and the unsynced hits no longer matter
+        self._local_counts: TLRUCache = TLRUCache(
+            maxsize=RATE_LIMIT_LOCAL_MAXSIZE,
+            ttu=lambda key, local, now: local[3],
+            timer=time.time
+        )
     
     async def check_rate_limit(self, user_id: str, tier: str = "free") -> Dict[str, Any]:
         """Check rate limit and return status"""
         try:
             limit_config = self.limits.get(tier, self.limits["free"])
-            key = f"rate_limit:{tier}:{user_id}"
+            # Sorted-set keys; kept apart from the old string counters to avoid WRONGTYPE
+            key = f"rate_limit:window:{tier}:{user_id}"
             
-            current = redis_client.get(key)
+            now = time.time()
+            deny_until = self._deny_until.get(key)
+            if deny_until is not None:
+                if deny_until > now:
+                    retry_after = math.ceil(deny_until - now)
+                    return {
+                        "allowed": False,
+                        "remaining": 0,
+                        "reset_time": deny_until,
+                        "retry_after": retry_after
+                    }
+                self._deny_until.pop(key, None)
             
-            if current is None:
-                # First request in window
-                redis_client.setex(key, limit_config["window"], 1)
-                return {
-                    "allowed": True,
-                    "remaining": limit_config["requests"] - 1,
-                    "reset_time": time.time() + limit_config["window"]
-                }
+            backlog = 0
+            if tier == "enterprise":
+                local = self._local_counts.pop(key, None)
+                if local is not None:
+                    unsynced, synced_at, synced_remaining, reset_time = local
+                    if (unsynced + 1 < ENTERPRISE_SYNC_EVERY
+                            and now - synced_at < ENTERPRISE_SYNC_SECONDS
+                            and unsynced < synced_remaining):
+                        self._local_counts[key] = (unsynced + 1, synced_at, synced_remaining, reset_time)
+                        return {
+                            "allowed": True,
+                            "remaining": synced_remaining - unsynced - 1,
+                            "reset_time": reset_time
+                        }
+                    backlog = unsynced
             
-            current_count = int(current)
+            allowed, remaining, reset_ms = await self.script(
+                keys=[key],
+                args=[
+                    int(time.time() * 1000),
+                    limit_config["window"] * 1000,
+                    limit_config["requests"],
+                    uuid.uuid4().hex,
+                    backlog
+                ]
+            )
+            ttl = math.ceil(reset_ms / 1000)
             
-            if current_count >= limit_config["requests"]:
-                ttl = redis_client.ttl(key)
+            if not allowed:
+                self._deny_until[key] = time.time() + ttl
                 return {
                     "allowed": False,
                     "remaining": 0,
@@ -117,13 +225,13 @@ class RateLimiter:
                     "retry_after": ttl
                 }
             
-            # Increment counter
-            redis_client.incr(key)
+            if tier == "enterprise":
+                self._local_counts[key] = (0, time.time(), remaining, time.time() + ttl)
             
             return {
                 "allowed": True,
-                "remaining": limit_config["requests"] - current_count - 1,
-                "reset_time": time.time() + redis_client.ttl(key)
+                "remaining": remaining,
+                "reset_time": time.time() + ttl
             }
             
         except Exception as e:
@@ -133,45 +241,71 @@ class RateLimiter:
 
 rate_limiter = RateLimiter()
 
+# Circuit state is packed into one int per service:
+#   bits 0-1   state (closed / open / half-open)
+#   bits 2-15  consecutive failure count
+#   bits 16+   last failure time, epoch seconds
+CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN = 0, 1, 2
+CIRCUIT_STATE_NAMES = ("closed", "open", "half-open")
+_STATE_MASK = 0b11
+_FAILURE_SHIFT = 2
+_FAILURE_MASK = 0x3FFF
+_TIME_SHIFT = 16
+
 class CircuitBreaker:
     """Circuit breaker for service resilience"""
     
     def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
-        self.failure_count = {}
-        self.last_failure_time = {}
-        self.state = {}  # "closed", "open", "half-open"
+        # Known services get fixed slots; anything else is appended on first use
+        self.service_slots = {"chat_service": 0, "retrieval_service": 1}
+        self._state_words = [0] * len(self.service_slots)
+    
+    def _slot(self, service_name: str) -> int:
+        slot = self.service_slots.get(service_name)
+        if slot is None:
+            slot = self.service_slots[service_name] = len(self._state_words)
+            self._state_words.append(0)
+        return slot
     
     def is_available(self, service_name: str) -> bool:
         """Check if service is available"""
-        current_state = self.state.get(service_name, "closed")
+        slot = self._slot(service_name)
+        word = self._state_words[slot]
         
-        if current_state == "closed":
+        if word & _STATE_MASK != CIRCUIT_OPEN:
             return True
-        elif current_state == "open":
-            # Check if recovery timeout has passed
-            last_failure = self.last_failure_time.get(service_name, 0)
-            if time.time() - last_failure > self.recovery_timeout:
-                self.state[service_name] = "half-open"
-                return True
-            return False
-        else:  # half-open
+        
+        # Check if recovery timeout has passed
+        if time.time() - (word >> _TIME_SHIFT) > self.recovery_timeout:
+            self._state_words[slot] = (word & ~_STATE_MASK) | CIRCUIT_HALF_OPEN
             return True
+        return False
     
     def record_success(self, service_name: str):
         """Record successful request"""
-        self.failure_count[service_name] = 0
-        self.state[service_name] = "closed"
+        slot = self._slot(service_name)
+        # Clear failures and state (closed); keep the last failure time
+        self._state_words[slot] &= ~((_FAILURE_MASK << _FAILURE_SHIFT) | _STATE_MASK)
     
     def record_failure(self, service_name: str):
         """Record failed request"""
-        self.failure_count[service_name] = self.failure_count.get(service_name, 0) + 1
-        self.last_failure_time[service_name] = time.time()
+        slot = self._slot(service_name)
+        word = self._state_words[slot]
+        failures = min(((word >> _FAILURE_SHIFT) & _FAILURE_MASK) + 1, _FAILURE_MASK)
+        state = word & _STATE_MASK
         
-        if self.failure_count[service_name] >= self.failure_threshold:
-            self.state[service_name] = "open"
+        if failures >= self.failure_threshold:
+            state = CIRCUIT_OPEN
             logger.warning(f"Circuit breaker opened for {service_name}")
+        
+        self._state_words[slot] = (int(time.time()) << _TIME_SHIFT) | (failures << _FAILURE_SHIFT) | state
+    
+    def snapshot(self, service_name: str) -> Tuple[str, int]:
+        """Return (state name, failure count) for metrics"""
+        word = self._state_words[self._slot(service_name)]
+        return CIRCUIT_STATE_NAMES[word & _STATE_MASK], (word >> _FAILURE_SHIFT) & _FAILURE_MASK
 
 circuit_breaker = CircuitBreaker()
 
@@ -187,54 +321,76 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     # In production, validate JWT token
     # For demo, parse simple token format: "user_id:tier"
     try:
-        parts = credentials.credentials.split(":")
-        user_id = parts[0] if len(parts) > 0 else "demo_user"
-        tier = parts[1] if len(parts) > 1 else "free"
+        user_id, _, tier = credentials.credentials.partition(":")
+        user_id = user_id or "demo_user"
+        tier = tier or "free"
         
         return {
             "user_id": user_id,
             "tier": tier,
             "permissions": ["chat", "history"]
         }
-    except:
+    except (AttributeError, ValueError):
         return {
             "user_id": "demo_user",
             "tier": "free",
             "permissions": ["chat"]
         }
 
-@app.middleware("http")
-async def add_rate_limit_headers(request: Request, call_next):
-    """Add rate limiting headers to responses"""
-    response = await call_next(request)
+class StaticHeadersMiddleware:
+    """Pure ASGI middleware that appends constant headers to every HTTP response"""
     
-    # Add standard rate limit headers
-    response.headers["X-RateLimit-Limit"] = "100"
-    response.headers["X-RateLimit-Window"] = "3600"
+    def __init__(self, app, headers: Dict[str, str]):
+        self.app = app
+        # Encode once; each response just extends its header list
+        self.raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ]
     
-    return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *self.raw_headers]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+# Add standard rate limit headers
+app.add_middleware(
+    StaticHeadersMiddleware,
+    headers={"X-RateLimit-Limit": "100", "X-RateLimit-Window": "3600"}
+)
+
+async def probe_services(client: httpx.AsyncClient):
+    """Hit every downstream /health endpoint concurrently"""
+    services = ["chat_service", "retrieval_service"]
+    results = await asyncio.gather(
+        *(client.get(f"{load_balancer.get_service_url(name)}/health", timeout=5.0) for name in services),
+        return_exceptions=True
+    )
+    return list(zip(services, results))
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize gateway on startup"""
     logger.info("API Gateway starting up...")
     
     try:
         # Test Redis connection
-        redis_client.ping()
+        await redis_client.ping()
         
         # Test service connections
-        async with httpx.AsyncClient() as client:
-            for service_name in ["chat_service", "retrieval_service"]:
-                try:
-                    url = load_balancer.get_service_url(service_name)
-                    response = await client.get(f"{url}/health", timeout=5.0)
-                    if response.status_code == 200:
-                        logger.info(f"{service_name} is healthy")
-                    else:
-                        logger.warning(f"{service_name} health check failed: {response.status_code}")
-                except Exception as e:
-                    logger.error(f"Failed to connect to {service_name}: {e}")
+        for service_name, result in await probe_services(app.state.http_client):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to connect to {service_name}: {result}")
+            elif result.status_code == 200:
+                logger.info(f"{service_name} is healthy")
+            else:
+                logger.warning(f"{service_name} health check failed: {result.status_code}")
         
         logger.info("API Gateway started successfully")
         
@@ -243,28 +399,25 @@ async def startup_event():
         raise
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Gateway health check"""
     try:
         # Check Redis
-        redis_client.ping()
+        await redis_client.ping()
         
         # Check downstream services
         service_health = {}
-        async with httpx.AsyncClient() as client:
-            for service_name in ["chat_service", "retrieval_service"]:
-                try:
-                    url = load_balancer.get_service_url(service_name)
-                    response = await client.get(f"{url}/health", timeout=5.0)
-                    service_health[service_name] = {
-                        "status": "healthy" if response.status_code == 200 else "unhealthy",
-                        "response_time": response.elapsed.total_seconds()
-                    }
-                except Exception as e:
-                    service_health[service_name] = {
-                        "status": "unhealthy",
-                        "error": str(e)
-                    }
+        for service_name, result in await probe_services(request.app.state.http_client):
+            if isinstance(result, Exception):
+                service_health[service_name] = {
+                    "status": "unhealthy",
+                    "error": str(result)
+                }
+            else:
+                service_health[service_name] = {
+                    "status": "healthy" if result.status_code == 200 else "unhealthy",
+                    "response_time": result.elapsed.total_seconds()
+                }
         
         return {
             "status": "healthy",
@@ -281,6 +434,7 @@ async def health_check():
 @app.post("/api/v1/chat", response_model=ChatResponse)
 async def chat_proxy(
     request: ChatRequest,
+    http_request: Request,
     user_info: Dict[str, Any] = Depends(get_current_user)
 ):
     """Proxy chat requests to chat service"""
@@ -321,34 +475,49 @@ async def chat_proxy(
         service_url = load_balancer.get_service_url("chat_service")
         
         # Forward request to chat service
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{service_url}/chat",
-                json=request.dict(),
-                headers={
-                    "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}",
-                    "X-Request-ID": str(time.time())
-                },
-                timeout=30.0
+        client = http_request.app.state.http_client
+        upstream_request = client.build_request(
+            "POST",
+            f"{service_url}/chat",
+            content=orjson.dumps(request.model_dump()),
+            headers={
+                "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}",
+                "Content-Type": "application/json",
+                # Propagate the caller's request ID so traces stitch across the gateway
+                "X-Request-ID": http_request.headers.get("x-request-id") or uuid.uuid4().hex
+            },
+            timeout=30.0
+        )
+        response = await client.send(upstream_request, stream=True)
+        
+        if response.status_code == 200:
+            circuit_breaker.record_success("chat_service")
+            
+            # Pass the body through untouched; gateway metadata goes in headers
+            headers = {
+                "X-Gateway-Time": f"{time.time() - start_time:.4f}",
+                "X-RateLimit-Remaining": str(rate_limit_result["remaining"])
+            }
+            if "content-encoding" in response.headers:
+                headers["Content-Encoding"] = response.headers["content-encoding"]
+            
+            return StreamingResponse(
+                response.aiter_raw(),
+                status_code=response.status_code,
+                media_type="application/json",
+                headers=headers,
+                background=BackgroundTask(response.aclose)
+            )
+        else:
+            await response.aread()
+            await response.aclose()
+            circuit_breaker.record_failure("chat_service")
+            logger.error(f"Chat service error: {response.status_code} - {response.text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Chat service error: {response.text}"
             )
             
-            if response.status_code == 200:
-                circuit_breaker.record_success("chat_service")
-                result = response.json()
-                
-                # Add gateway metadata
-                result["gateway_processing_time"] = time.time() - start_time
-                result["rate_limit_remaining"] = rate_limit_result["remaining"]
-                
-                return result
-            else:
-                circuit_breaker.record_failure("chat_service")
-                logger.error(f"Chat service error: {response.status_code} - {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Chat service error: {response.text}"
-                )
-                
     except HTTPException:
         raise
     except Exception as e:
@@ -358,6 +527,7 @@ async def chat_proxy(
 
 @app.get("/api/v1/conversations/{conversation_id}/messages")
 async def get_conversation_messages_proxy(
+    request: Request,
     conversation_id: str,
     limit: int = 20,
     user_info: Dict[str, Any] = Depends(get_current_user)
@@ -370,24 +540,24 @@ async def get_conversation_messages_proxy(
         
         service_url = load_balancer.get_service_url("chat_service")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{service_url}/conversations/{conversation_id}/messages",
-                params={"limit": limit},
-                headers={
-                    "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}"
-                },
-                timeout=15.0
+        client = request.app.state.http_client
+        response = await client.get(
+            f"{service_url}/conversations/{conversation_id}/messages",
+            params={"limit": limit},
+            headers={
+                "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}"
+            },
+            timeout=15.0
+        )
+        
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=response.text
             )
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.text
-                )
-                
     except HTTPException:
         raise
     except Exception as e:
@@ -396,6 +566,7 @@ async def get_conversation_messages_proxy(
 
 @app.get("/api/v1/users/{user_id}/conversations")
 async def get_user_conversations_proxy(
+    request: Request,
     user_id: str,
     limit: int = 20,
     user_info: Dict[str, Any] = Depends(get_current_user)
@@ -408,37 +579,38 @@ async def get_user_conversations_proxy(
         
         service_url = load_balancer.get_service_url("chat_service")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{service_url}/users/{user_id}/conversations",
-                params={"limit": limit},
-                headers={
-                    "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}"
-                },
-                timeout=15.0
+        client = request.app.state.http_client
+        response = await client.get(
+            f"{service_url}/users/{user_id}/conversations",
+            params={"limit": limit},
+            headers={
+                "Authorization": f"Bearer {user_info['user_id']}:{user_info['tier']}"
+            },
+            timeout=15.0
+        )
+        
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=response.text
             )
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.text
-                )
-                
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"User conversations proxy failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v1/creators")
-async def get_creators():
-    """Get available creators"""
-    from config.settings import get_all_creators
+@lru_cache(maxsize=1)
+def creators_payload() -> bytes:
+    """Serialize the active creator list once; creator config is static"""
+    from config.settings import get_all_creators, thaw_config
     
-    creators = get_all_creators()
-    return {
+    # The creator table is frozen; serialize a plain copy
+    creators = thaw_config(get_all_creators())
+    return orjson.dumps({
         "creators": [
             {
                 "id": creator_id,
@@ -452,7 +624,12 @@ async def get_creators():
             for creator_id, config in creators.items()
             if config.get("is_active", True)
         ]
-    }
+    })
+
+@app.get("/api/v1/creators")
+async def get_creators():
+    """Get available creators"""
+    return Response(content=creators_payload(), media_type="application/json")
 
 @app.get("/api/v1/metrics")
 async def get_gateway_metrics():
@@ -466,10 +643,7 @@ async def get_gateway_metrics():
                 "error_rate": "N/A"
             },
             "circuit_breakers": {
-                service: {
-                    "state": circuit_breaker.state.get(service, "closed"),
-                    "failure_count": circuit_breaker.failure_count.get(service, 0)
-                }
+                service: dict(zip(("state", "failure_count"), circuit_breaker.snapshot(service)))
                 for service in ["chat_service", "retrieval_service"]
             },
             "timestamp": time.time()
@@ -510,6 +684,8 @@ if __name__ == "__main__":
         host=config.host,
         port=config.port,
         workers=config.workers,
+        loop="uvloop",
+        http="httptools",
         reload=settings.debug,
         log_level=settings.log_level.lower()
     ) 
\ No newline at end of file
@@ -1,34 +1,159 @@
 import google.generativeai as genai
 import httpx
 import asyncio
+import hashlib
+import re
 import time
+from datetime import datetime, timezone
+from itertools import islice
+from types import SimpleNamespace
 import logging
-from typing import Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
-from sqlalchemy.orm import Session
-from database.connection import get_db
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+from cachetools import TTLCache
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import db_manager
 from database.models import User, UserProfile, Conversation, Message, Creator
 from shared.models import (
     ChatRequest, ChatResponse, RetrievalRequest, QueryIntent, 
-    MessageRole, QueryAnalysis
+    QueryComplexity, MessageRole, QueryAnalysis
 )
-from config.settings import settings, get_creator_config
+from config.settings import settings, get_creator_config, get_all_creators
 
 logger = logging.getLogger(__name__)
 
+# Profile extraction patterns, compiled once instead of on every message
+_CHANNEL_PATTERNS = [re.compile(p) for p in (
+    r"my channel is (.+)",
+    r"channel name is (.+)",
+    r"i have a channel called (.+)",
+    r"mera channel (.+) hai"
+)]
+_CLEANUP_RE = re.compile(r'\b(called|named|hai|is)\b')
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """Compile a keyword list into one alternation so the text is scanned once"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+GOAL_KEYWORDS = ['goal', 'want to', 'planning to', 'trying to', 'chahta hun', 'karna hai']
+EQUIPMENT_KEYWORDS = ['camera', 'mic', 'microphone', 'laptop', 'phone', 'editing software']
+GREETINGS = ["hi", "hello", "hey", "namaste", "hola"]
+INAPPROPRIATE_KEYWORDS = ["sex", "porn", "adult", "nsfw", "sext"]
+
+_GOAL_RE = _keyword_re(GOAL_KEYWORDS)
+_EQUIPMENT_RE = _keyword_re(EQUIPMENT_KEYWORDS)
+# Word-bounded so "hi" in "which" never triggers a greeting
+_GREETING_RE = re.compile(r"\b(?:%s)\b" % "|".join(GREETINGS))
+# Leading boundary only, so "pornography", "sexual" and "adults" are still caught
+_INAPPROPRIATE_RE = re.compile(r"\b(?:%s)" % "|".join(INAPPROPRIATE_KEYWORDS))
+_STEP_RE = re.compile(r"\b(?:how to|steps|kaise)\b")
+# Only a greeting with nothing else gets the canned reply; "hello, how to monetize?" goes to the model
+_BARE_GREETING_RE = re.compile(r"^\s*(?:%s)\W*$" % "|".join(GREETINGS))
+
+# Turns kept denormalized on Conversation.recent_messages for prompt history
+RECENT_MESSAGES_WINDOW = 12
+
+def message_turn(message: Message) -> Dict[str, str]:
+    """Reduce a message to the {role, content} turn kept in the history window"""
+    return {"role": message.role, "content": message.content}
+
+def get_fallback_response(query_analysis: QueryAnalysis) -> str:
+    """Get canned response for trivial queries or when AI generation fails"""
+    if query_analysis.intent == QueryIntent.GREETING:
+        return "Namaste! Main Hawa Singh hun, YouTube growth expert. Kaise help kar sakta hun aapki?"
+    elif query_analysis.intent == QueryIntent.INAPPROPRIATE:
+        return "Main sirf YouTube growth aur content creation ke baare mein help kar sakta hun. Koi YouTube related question hai?"
+    else:
+        return "Sorry, main abhi response generate nahi kar pa raha. Thoda wait karke phir try karo ya question ko simple words mein poocho."
+
+def is_canned_query(query: str, query_analysis: QueryAnalysis) -> bool:
+    """Check whether a query is answered by a canned response instead of the model"""
+    if query_analysis.intent == QueryIntent.INAPPROPRIATE:
+        return True
+    return query_analysis.intent == QueryIntent.GREETING and bool(_BARE_GREETING_RE.match(query.lower()))
+
+def build_persona(creator_config: Dict[str, Any]) -> str:
+    """Build the static persona block of the system prompt for a creator"""
+    creator_name = creator_config.get('name', 'AI Assistant')
+    specialty = creator_config.get('specialty', 'YouTube Expert')
+    personality = creator_config.get('personality', {})
+    
+    return f"""You are {creator_name}, a {specialty}. 
+
+PERSONALITY:
+- Tone: {personality.get('tone', 'friendly and helpful')}
+- Language Style: {personality.get('language_style', 'professional with casual elements')}
+- Expertise: {', '.join(personality.get('expertise_areas', ['YouTube growth']))}
+"""
+
+# Persona blocks never change for a configured creator, so render them once at import
+CREATOR_PERSONAS = {creator_id: build_persona(config) for creator_id, config in get_all_creators().items()}
+
+# Query-type specific instructions appended after the persona
+INTENT_INSTRUCTIONS = {
+    QueryIntent.HOW_TO: """
+RESPONSE FORMAT FOR HOW-TO QUESTIONS:
+Provide detailed step-by-step instructions in this format:
+
+**[Topic] ke Steps:**
+
+**Step 1: [Title]**
+- [Detailed explanation in Hindi/Hinglish]
+- [Practical tip]
+
+**Step 2: [Title]**
+- [Detailed explanation]
+- [Example if needed]
+
+[Continue for 3-8 steps based on complexity]
+
+**Pro Tips:**
+1. [Specific actionable tip]
+2. [Advanced technique]
+3. [Common mistake to avoid]
+4. [Bonus insight]
+
+**Next Steps:**
+[What to do after completing these steps]
+
+Use authentic Hindi/Hinglish expressions like "bhai", "tu", "tujhe", "dekh", "samjha?"
+""",
+    QueryIntent.INAPPROPRIATE: """
+INAPPROPRIATE CONTENT RESPONSE:
+Politely decline and redirect to YouTube-related topics. Be professional but firm.
+"""
+}
+
+def snapshot_profile(profile: UserProfile) -> SimpleNamespace:
+    """Copy the prompt-relevant profile fields off the ORM object for caching"""
+    return SimpleNamespace(
+        user_id=profile.user_id,
+        channel_name=profile.channel_name,
+        goals=list(profile.goals or []),
+        equipment=list(profile.equipment or [])
+    )
+
+# Rough client-side estimate for per-turn text; the static prefix gets an exact count at startup
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text without calling the API"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
 class UserProfileManager:
     """Manages user profiles and context extraction"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_or_create_user_profile(self, user_id: str) -> UserProfile:
+    async def get_or_create_user_profile(self, user_id: str) -> UserProfile:
         """Get existing user profile or create new one"""
         try:
             # Try to get existing profile
-            profile = self.db.query(UserProfile).filter(
-                UserProfile.user_id == user_id
-            ).first()
+            result = await self.db.execute(
+                select(UserProfile).where(UserProfile.user_id == user_id)
+            )
+            profile = result.scalars().first()
             
             if not profile:
                 # Create new profile
@@ -37,15 +162,13 @@ class UserProfileManager:
                     profile_data={}
                 )
                 self.db.add(profile)
-                self.db.commit()
-                self.db.refresh(profile)
                 logger.info(f"Created new user profile for user: {user_id}")
             
             return profile
             
         except Exception as e:
             logger.error(f"Failed to get/create user profile: {e}")
-            self.db.rollback()
+            await self.db.rollback()
             raise
     
     def extract_profile_info(self, message: str, current_profile: UserProfile) -> Dict[str, Any]:
@@ -54,28 +177,19 @@ class UserProfileManager:
         extracted_info = {}
         
         # Extract channel name
-        channel_patterns = [
-            r"my channel is (.+)",
-            r"channel name is (.+)",
-            r"i have a channel called (.+)",
-            r"mera channel (.+) hai"
-        ]
-        
-        import re
-        for pattern in channel_patterns:
-            match = re.search(pattern, message_lower)
+        for pattern in _CHANNEL_PATTERNS:
+            match = pattern.search(message_lower)
             if match:
                 channel_name = match.group(1).strip()
                 # Clean up common words
-                channel_name = re.sub(r'\b(called|named|hai|is)\b', '', channel_name).strip()
+                channel_name = _CLEANUP_RE.sub('', channel_name).strip()
                 if channel_name and len(channel_name) > 2:
                     extracted_info['channel_name'] = channel_name
                     break
         
         # Extract goals
-        goal_keywords = ['goal', 'want to', 'planning to', 'trying to', 'chahta hun', 'karna hai']
-        if any(keyword in message_lower for keyword in goal_keywords):
-            goals = current_profile.goals or []
+        if _GOAL_RE.search(message_lower):
+            goals = list(current_profile.goals or [])
             # Simple goal extraction - can be enhanced with NLP
             if 'subscribers' in message_lower:
                 goals.append('grow_subscribers')
@@ -86,23 +200,22 @@ class UserProfileManager:
             
             extracted_info['goals'] = list(set(goals))  # Remove duplicates
         
-        # Extract equipment mentions
-        equipment_keywords = ['camera', 'mic', 'microphone', 'laptop', 'phone', 'editing software']
-        equipment = current_profile.equipment or []
-        for keyword in equipment_keywords:
-            if keyword in message_lower and keyword not in equipment:
-                equipment.append(keyword)
+        # Extract equipment mentions (most messages mention none, so one scan
+        # decides whether the per-keyword pass is needed at all)
+        equipment = list(current_profile.equipment or [])
+        if _EQUIPMENT_RE.search(message_lower):
+            for keyword in EQUIPMENT_KEYWORDS:
+                if keyword in message_lower and keyword not in equipment:
+                    equipment.append(keyword)
         
         if equipment != (current_profile.equipment or []):
             extracted_info['equipment'] = equipment
         
         return extracted_info
     
-    def update_profile(self, user_id: str, extracted_info: Dict[str, Any]) -> UserProfile:
-        """Update user profile with extracted information"""
+    def update_profile(self, profile: UserProfile, extracted_info: Dict[str, Any]) -> UserProfile:
+        """Stage extracted information on the user profile (committed by the caller)"""
         try:
-            profile = self.get_or_create_user_profile(user_id)
-            
             # Update fields
             for key, value in extracted_info.items():
                 if hasattr(profile, key):
@@ -113,32 +226,55 @@ class UserProfileManager:
                     profile_data[key] = value
                     profile.profile_data = profile_data
             
-            self.db.commit()
-            self.db.refresh(profile)
-            
-            logger.info(f"Updated profile for user {user_id}: {extracted_info}")
+            logger.info(f"Updated profile for user {profile.user_id}: {extracted_info}")
             return profile
             
         except Exception as e:
             logger.error(f"Failed to update user profile: {e}")
-            self.db.rollback()
             raise
 
 class ConversationManager:
     """Manages conversations and message history"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_or_create_conversation(self, user_id: str, creator_id: str, conversation_id: Optional[str] = None) -> Conversation:
+    async def fetch_chat_context(self, user_id: str, creator_id: str, conversation_id: Optional[str] = None) -> Tuple[Optional[UserProfile], Optional[Conversation]]:
+        """Load the user profile and requested conversation in one query"""
+        if not conversation_id:
+            result = await self.db.execute(
+                select(UserProfile).where(UserProfile.user_id == user_id)
+            )
+            return result.scalars().first(), None
+        
+        result = await self.db.execute(
+            select(UserProfile, Conversation).outerjoin(
+                Conversation,
+                and_(
+                    Conversation.user_id == UserProfile.user_id,
+                    Conversation.id == conversation_id,
+                    Conversation.creator_id == creator_id
+                )
+            ).where(UserProfile.user_id == user_id)
+        )
+        row = result.first()
+        
+        if row is None:
+            return None, None
+        return row[0], row[1]
+    
+    async def get_or_create_conversation(self, user_id: str, creator_id: str, conversation_id: Optional[str] = None) -> Conversation:
         """Get existing conversation or create new one"""
         try:
             if conversation_id:
-                conversation = self.db.query(Conversation).filter(
-                    Conversation.id == conversation_id,
-                    Conversation.user_id == user_id,
-                    Conversation.creator_id == creator_id
-                ).first()
+                result = await self.db.execute(
+                    select(Conversation).where(
+                        Conversation.id == conversation_id,
+                        Conversation.user_id == user_id,
+                        Conversation.creator_id == creator_id
+                    )
+                )
+                conversation = result.scalars().first()
                 
                 if conversation:
                     return conversation
@@ -147,46 +283,61 @@ class ConversationManager:
             conversation = Conversation(
                 user_id=user_id,
                 creator_id=creator_id,
-                title=f"Chat with {creator_id}"
+                title=f"Chat with {creator_id}",
+                recent_messages=[]
             )
             self.db.add(conversation)
-            self.db.commit()
-            self.db.refresh(conversation)
+            # Flush so the generated id is available to the messages staged next
+            await self.db.flush()
             
             logger.info(f"Created new conversation: {conversation.id}")
             return conversation
             
         except Exception as e:
             logger.error(f"Failed to get/create conversation: {e}")
-            self.db.rollback()
+            await self.db.rollback()
             raise
     
-    def save_message(self, conversation_id: str, role: MessageRole, content: str, metadata: Dict[str, Any] = None) -> Message:
-        """Save message to database"""
+    @staticmethod
+    def new_message(conversation: Conversation, role: MessageRole, content: str, metadata: Dict[str, Any] = None) -> Message:
+        """Build a message without staging it, so it can be saved later in a batch"""
+        return Message(
+            conversation_id=conversation.id,
+            role=role.value,
+            content=content,
+            metadata=metadata or {},
+            # Set client-side so messages inserted in one flush still order correctly
+            created_at=datetime.now(timezone.utc)
+        )
+    
+    def save_messages(self, conversation: Conversation, messages: List[Message]):
+        """Stage messages for saving (committed by the caller)"""
         try:
-            message = Message(
-                conversation_id=conversation_id,
-                role=role.value,
-                content=content,
-                metadata=metadata or {}
-            )
-            self.db.add(message)
-            self.db.commit()
-            self.db.refresh(message)
+            self.db.add_all(messages)
             
-            return message
+            # Keep the rolling window in the same transaction; reassign so the JSON change is tracked
+            recent = (conversation.recent_messages or []) + [message_turn(message) for message in messages]
+            conversation.recent_messages = recent[-RECENT_MESSAGES_WINDOW:]
             
         except Exception as e:
-            logger.error(f"Failed to save message: {e}")
-            self.db.rollback()
+            logger.error(f"Failed to save messages: {e}")
             raise
     
-    def get_recent_messages(self, conversation_id: str, limit: int = 10) -> List[Message]:
+    async def load_recent_messages(self, conversation: Conversation):
+        """Seed the rolling window for conversations created before it existed"""
+        if conversation.recent_messages is None:
+            messages = await self.get_recent_messages(conversation.id, RECENT_MESSAGES_WINDOW)
+            conversation.recent_messages = [message_turn(message) for message in messages]
+    
+    async def get_recent_messages(self, conversation_id: str, limit: int = 10) -> List[Message]:
         """Get recent messages from conversation"""
         try:
-            messages = self.db.query(Message).filter(
-                Message.conversation_id == conversation_id
-            ).order_by(Message.created_at.desc()).limit(limit).all()
+            result = await self.db.execute(
+                select(Message).where(
+                    Message.conversation_id == conversation_id
+                ).order_by(Message.created_at.desc()).limit(limit)
+            )
+            messages = result.scalars().all()
             
             return list(reversed(messages))  # Return in chronological order
             
@@ -200,7 +351,25 @@ class AIResponseGenerator:
     def __init__(self):
         genai.configure(api_key=settings.ai.google_api_key)
         self.model = genai.GenerativeModel(settings.ai.model_name)
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Exact token counts keyed by system prompt text, filled in at startup
+        self.static_tokens: Dict[str, int] = {}
+    
+    async def load_static_token_counts(self):
+        """Count tokens once for every creator persona and intent instruction combination"""
+        prompts = [
+            persona + instructions
+            for persona in CREATOR_PERSONAS.values()
+            for instructions in ("", *INTENT_INSTRUCTIONS.values())
+        ]
+        results = await asyncio.gather(
+            *(self.model.count_tokens_async(prompt) for prompt in prompts),
+            return_exceptions=True
+        )
+        for prompt, result in zip(prompts, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Token count failed, falling back to estimates: {result}")
+                continue
+            self.static_tokens[prompt] = result.total_tokens
     
     async def generate_response(
         self,
@@ -209,202 +378,188 @@ class AIResponseGenerator:
         user_profile: UserProfile,
         creator_config: Dict[str, Any],
         query_analysis: QueryAnalysis,
-        conversation_history: List[Message]
+        conversation_history: List[Dict[str, str]]
     ) -> str:
         """Generate AI response asynchronously"""
         
+        # Build prompt parts, most stable first so the shared prefix stays identical across turns
+        prompt_parts = self._build_prompt_parts(
+            query, context_chunks, user_profile, creator_config, query_analysis, conversation_history
+        )
+        
         try:
-            # Run AI generation in thread pool
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                self.executor,
-                self._generate_response_sync,
-                query, context_chunks, user_profile, creator_config, query_analysis, conversation_history
+            response = await self.model.generate_content_async(
+                prompt_parts,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=settings.ai.max_tokens,
+                    temperature=settings.ai.temperature,
+                )
             )
-            return response
+            
+            return response.text.strip()
             
         except Exception as e:
-            logger.error(f"AI response generation failed: {e}")
-            return self._get_fallback_response(query_analysis)
+            logger.error(f"Gemini API call failed: {e}")
+            return get_fallback_response(query_analysis)
     
-    def _generate_response_sync(
+    async def stream_response(
         self,
         query: str,
         context_chunks: List[Dict[str, Any]],
         user_profile: UserProfile,
         creator_config: Dict[str, Any],
         query_analysis: QueryAnalysis,
-        conversation_history: List[Message]
-    ) -> str:
-        """Synchronous AI response generation"""
-        
-        # Build system prompt
-        system_prompt = self._build_system_prompt(creator_config, user_profile, query_analysis)
+        conversation_history: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """Yield AI response text as Gemini streams it"""
         
-        # Build context
-        context_text = self._build_context(context_chunks)
-        
-        # Build conversation history
-        history_text = self._build_history(conversation_history)
-        
-        # Build final prompt
-        prompt = f"""{system_prompt}
-
-CONTEXT INFORMATION:
-{context_text}
-
-CONVERSATION HISTORY:
-{history_text}
-
-USER QUERY: {query}
-
-RESPONSE:"""
+        prompt_parts = self._build_prompt_parts(
+            query, context_chunks, user_profile, creator_config, query_analysis, conversation_history
+        )
         
+        streamed = False
         try:
-            response = self.model.generate_content(
-                prompt,
+            response = await self.model.generate_content_async(
+                prompt_parts,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=settings.ai.max_tokens,
                     temperature=settings.ai.temperature,
-                )
+                ),
+                stream=True
             )
             
-            return response.text.strip()
-            
+            async for chunk in response:
+                # Chunks without parts (e.g. a final MAX_TOKENS/SAFETY chunk) raise on .text
+                if chunk.parts and chunk.text:
+                    streamed = True
+                    yield chunk.text
+                    
         except Exception as e:
-            logger.error(f"Gemini API call failed: {e}")
-            return self._get_fallback_response(query_analysis)
+            logger.error(f"Gemini streaming call failed: {e}")
+            # Only fall back if nothing reached the client; otherwise keep the partial reply
+            if not streamed:
+                yield get_fallback_response(query_analysis)
     
-    def _build_system_prompt(self, creator_config: Dict[str, Any], user_profile: UserProfile, query_analysis: QueryAnalysis) -> str:
-        """Build system prompt based on creator and query type"""
+    def _build_prompt_parts(
+        self,
+        query: str,
+        context_chunks: List[Dict[str, Any]],
+        user_profile: UserProfile,
+        creator_config: Dict[str, Any],
+        query_analysis: QueryAnalysis,
+        conversation_history: List[Dict[str, str]]
+    ) -> List[str]:
+        """Build prompt as separate parts, ordered from static to per-turn content"""
+        system_prompt = self._build_system_prompt(creator_config, query_analysis)
+        profile = self._build_profile(user_profile)
+        history = f"CONVERSATION HISTORY:\n{self._build_history(conversation_history)}"
+        query_part = f"USER QUERY: {query}\n\nRESPONSE:"
         
-        creator_name = creator_config.get('name', 'AI Assistant')
-        specialty = creator_config.get('specialty', 'YouTube Expert')
-        personality = creator_config.get('personality', {})
+        # Whatever the fixed parts leave of the prompt budget goes to retrieved context
+        static_tokens = self.static_tokens.get(system_prompt) or estimate_tokens(system_prompt)
+        budget = settings.ai.max_prompt_tokens - static_tokens - sum(
+            estimate_tokens(part) for part in (profile, history, query_part)
+        )
+        context_chunks = self._fit_context(context_chunks, budget)
         
-        base_prompt = f"""You are {creator_name}, a {specialty}. 
-
-PERSONALITY:
-- Tone: {personality.get('tone', 'friendly and helpful')}
-- Language Style: {personality.get('language_style', 'professional with casual elements')}
-- Expertise: {', '.join(personality.get('expertise_areas', ['YouTube growth']))}
-
-USER PROFILE:
-- Channel: {user_profile.channel_name or 'Not specified'}
-- Goals: {', '.join(user_profile.goals or ['General YouTube growth'])}
-- Equipment: {', '.join(user_profile.equipment or ['Not specified'])}
-"""
+        return [
+            system_prompt,
+            profile,
+            f"CONTEXT INFORMATION:\n{self._build_context(context_chunks)}",
+            history,
+            query_part
+        ]
+    
+    def _fit_context(self, context_chunks: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        """Keep the top chunks that fit in the remaining token budget"""
+        fitted = []
+        for chunk in islice(context_chunks, 5):
+            cost = estimate_tokens(chunk.get('content', ''))
+            if cost > budget:
+                logger.info(f"Dropped {min(len(context_chunks), 5) - len(fitted)} context chunks over the prompt budget")
+                break
+            budget -= cost
+            fitted.append(chunk)
+        return fitted
+    
+    def _build_system_prompt(self, creator_config: Dict[str, Any], query_analysis: QueryAnalysis) -> str:
+        """Build system prompt based on creator and query type"""
+        persona = CREATOR_PERSONAS.get(creator_config.get('id'))
+        if persona is None:
+            persona = build_persona(creator_config)
         
         # Add specific instructions based on query type
         if query_analysis.intent == QueryIntent.HOW_TO or query_analysis.is_step_by_step:
-            base_prompt += """
-RESPONSE FORMAT FOR HOW-TO QUESTIONS:
-Provide detailed step-by-step instructions in this format:
-
-**[Topic] ke Steps:**
-
-**Step 1: [Title]**
-- [Detailed explanation in Hindi/Hinglish]
-- [Practical tip]
-
-**Step 2: [Title]**
-- [Detailed explanation]
-- [Example if needed]
-
-[Continue for 3-8 steps based on complexity]
-
-**Pro Tips:**
-1. [Specific actionable tip]
-2. [Advanced technique]
-3. [Common mistake to avoid]
-4. [Bonus insight]
-
-**Next Steps:**
-[What to do after completing these steps]
-
-Use authentic Hindi/Hinglish expressions like "bhai", "tu", "tujhe", "dekh", "samjha?"
-"""
-        elif query_analysis.intent == QueryIntent.INAPPROPRIATE:
-            base_prompt += """
-INAPPROPRIATE CONTENT RESPONSE:
-Politely decline and redirect to YouTube-related topics. Be professional but firm.
+            return persona + INTENT_INSTRUCTIONS[QueryIntent.HOW_TO]
+        return persona + INTENT_INSTRUCTIONS.get(query_analysis.intent, "")
+    
+    def _build_profile(self, user_profile: UserProfile) -> str:
+        """Build the per-user profile block"""
+        return f"""USER PROFILE:
+- Channel: {user_profile.channel_name or 'Not specified'}
+- Goals: {', '.join(user_profile.goals or ['General YouTube growth'])}
+- Equipment: {', '.join(user_profile.equipment or ['Not specified'])}
 """
-        
-        return base_prompt
     
     def _build_context(self, context_chunks: List[Dict[str, Any]]) -> str:
         """Build context from retrieved chunks"""
         if not context_chunks:
             return "No specific context available."
         
-        context_parts = []
-        for i, chunk in enumerate(context_chunks[:5], 1):  # Limit to top 5 chunks
-            context_parts.append(f"Context {i}: {chunk.get('content', '')}")
-        
-        return "\n\n".join(context_parts)
+        return "\n\n".join(
+            f"Context {i}: {chunk.get('content', '')}"
+            for i, chunk in enumerate(islice(context_chunks, 5), 1)  # Limit to top 5 chunks
+        )
     
-    def _build_history(self, messages: List[Message]) -> str:
+    def _build_history(self, messages: List[Dict[str, str]]) -> str:
         """Build conversation history"""
         if not messages:
             return "No previous conversation."
         
-        history_parts = []
-        for message in messages[-6:]:  # Last 6 messages
-            role = "User" if message.role == "user" else "Assistant"
-            history_parts.append(f"{role}: {message.content}")
-        
-        return "\n".join(history_parts)
-    
-    def _get_fallback_response(self, query_analysis: QueryAnalysis) -> str:
-        """Get fallback response when AI generation fails"""
-        if query_analysis.intent == QueryIntent.GREETING:
-            return "Namaste! Main Hawa Singh hun, YouTube growth expert. Kaise help kar sakta hun aapki?"
-        elif query_analysis.intent == QueryIntent.INAPPROPRIATE:
-            return "Main sirf YouTube growth aur content creation ke baare mein help kar sakta hun. Koi YouTube related question hai?"
-        else:
-            return "Sorry, main abhi response generate nahi kar pa raha. Thoda wait karke phir try karo ya question ko simple words mein poocho."
-
+        return "\n".join(
+            f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['content']}"
+            for message in islice(messages, max(len(messages) - 6, 0), None)  # Last 6 messages
+        )
+    
 class ChatProcessor:
     """Main chat processing orchestrator"""
     
     def __init__(self):
         self.ai_generator = AIResponseGenerator()
+        # One pooled client for the retrieval service, kept alive across requests
+        self._http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            http2=True
+        )
+        # Retrieval results for recently asked questions, keyed by creator and query
+        self._context_cache = TTLCache(maxsize=10_000, ttl=600)
+        # Detached profile snapshots for returning users, keyed by user_id
+        self._profile_cache = TTLCache(maxsize=50_000, ttl=60)
+        # Strong references to in-flight background writes so they are not garbage collected
+        self._background_tasks = set()
+    
+    async def close(self):
+        """Finish pending background writes and close the pooled HTTP client"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self._http.aclose()
     
-    async def process_chat(self, request: ChatRequest, db: Session) -> ChatResponse:
+    async def process_chat(self, request: ChatRequest, db: AsyncSession) -> ChatResponse:
         """Process chat request and generate response"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        try:
-            # Initialize managers
-            profile_manager = UserProfileManager(db)
-            conversation_manager = ConversationManager(db)
-            
-            # Get or create user profile
-            user_profile = profile_manager.get_or_create_user_profile(request.user_id)
-            
-            # Extract profile information from message
-            extracted_info = profile_manager.extract_profile_info(request.message, user_profile)
-            if extracted_info:
-                user_profile = profile_manager.update_profile(request.user_id, extracted_info)
-            
-            # Get or create conversation
-            conversation = conversation_manager.get_or_create_conversation(
-                request.user_id, request.creator_id, request.conversation_id
-            )
-            
-            # Save user message
-            conversation_manager.save_message(
-                conversation.id, MessageRole.USER, request.message
-            )
-            
-            # Get conversation history
-            conversation_history = conversation_manager.get_recent_messages(conversation.id)
-            
-            # Get context from retrieval service
-            context_chunks = await self._get_context(request.message, request.creator_id)
-            
-            # Analyze query (simple analysis for now)
-            query_analysis = self._analyze_query_simple(request.message)
+        query_analysis = self._analyze_query_simple(request.message)
+        context_task = self._start_context(request, query_analysis)
+        user_profile, conversation, user_message = await self._prepare_turn(request, db, context_task)
+        
+        if context_task is None:
+            # Bare greetings and off-topic requests get a fixed reply, no retrieval or Gemini
+            context_chunks = []
+            ai_response = get_fallback_response(query_analysis)
+        else:
+            # Context was fetched from the retrieval service while the database work ran
+            context_chunks = await context_task
             
             # Get creator configuration
             creator_config = get_creator_config(request.creator_id)
@@ -416,35 +571,195 @@ class ChatProcessor:
                 user_profile=user_profile,
                 creator_config=creator_config,
                 query_analysis=query_analysis,
-                conversation_history=conversation_history
+                conversation_history=conversation.recent_messages + [message_turn(user_message)]
             )
+        
+        processing_time = time.perf_counter() - start_time
+        self._schedule_persist(conversation, user_message, ai_response, context_chunks, query_analysis, processing_time)
+        
+        return ChatResponse(
+            response=ai_response,
+            conversation_id=conversation.id,
+            context_used=len(context_chunks),
+            intent=query_analysis.intent,
+            processing_time=processing_time
+        )
+    
+    async def stream_chat(self, request: ChatRequest, db: AsyncSession) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Record the user turn, then return an iterator of (event, payload) pairs for the reply"""
+        start_time = time.perf_counter()
+        
+        query_analysis = self._analyze_query_simple(request.message)
+        context_task = self._start_context(request, query_analysis)
+        # Database work happens before streaming starts so failures still map to status codes
+        user_profile, conversation, user_message = await self._prepare_turn(request, db, context_task)
+        return self._stream_reply(
+            request, user_profile, conversation, query_analysis, user_message, context_task, start_time
+        )
+    
+    async def _stream_reply(
+        self,
+        request: ChatRequest,
+        user_profile: UserProfile,
+        conversation: Conversation,
+        query_analysis: QueryAnalysis,
+        user_message: Message,
+        context_task: Optional[asyncio.Task],
+        start_time: float
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield reply events as the model produces them"""
+        pieces = []
+        context_chunks = []
+        try:
+            yield "meta", {"conversation_id": str(conversation.id), "intent": query_analysis.intent.value}
+            
+            if context_task is None:
+                pieces.append(get_fallback_response(query_analysis))
+                yield "delta", {"text": pieces[0]}
+            else:
+                context_chunks = await context_task
+                creator_config = get_creator_config(request.creator_id)
+                
+                async for text in self.ai_generator.stream_response(
+                    query=request.message,
+                    context_chunks=context_chunks,
+                    user_profile=user_profile,
+                    creator_config=creator_config,
+                    query_analysis=query_analysis,
+                    conversation_history=conversation.recent_messages + [message_turn(user_message)]
+                ):
+                    pieces.append(text)
+                    yield "delta", {"text": text}
+        finally:
+            if context_task is not None and not context_task.done():
+                # Client went away before the reply started; drop the pending retrieval
+                context_task.cancel()
+            # Persist even if the client disconnects mid-stream, keeping whatever was generated
+            processing_time = time.perf_counter() - start_time
+            ai_response = "".join(pieces).strip()
+            self._schedule_persist(conversation, user_message, ai_response, context_chunks, query_analysis, processing_time)
+        
+        yield "done", {"context_used": len(context_chunks), "processing_time": processing_time}
+    
+    def _start_context(self, request: ChatRequest, query_analysis: QueryAnalysis) -> Optional[asyncio.Task]:
+        """Start retrieval right away so it overlaps the database work; canned replies need none"""
+        if is_canned_query(request.message, query_analysis):
+            return None
+        return asyncio.create_task(self._get_context(request.message, request.creator_id))
+    
+    async def _prepare_turn(
+        self,
+        request: ChatRequest,
+        db: AsyncSession,
+        context_task: Optional[asyncio.Task] = None
+    ) -> Tuple[UserProfile, Conversation, Message]:
+        """Load or create the profile and conversation and build the user message"""
+        try:
+            # Initialize managers
+            profile_manager = UserProfileManager(db)
+            conversation_manager = ConversationManager(db)
             
-            # Save assistant message
-            conversation_manager.save_message(
-                conversation.id, MessageRole.ASSISTANT, ai_response,
-                metadata={
-                    "context_chunks_used": len(context_chunks),
-                    "processing_time": time.time() - start_time,
-                    "query_intent": query_analysis.intent.value
-                }
-            )
+            cached_profile = self._profile_cache.get(request.user_id)
+            if cached_profile is not None:
+                # Returning user: only the conversation needs a lookup
+                user_profile = cached_profile
+                conversation = await conversation_manager.get_or_create_conversation(
+                    request.user_id, request.creator_id, request.conversation_id
+                )
+            else:
+                # Load profile and conversation together, creating them only on a miss
+                user_profile, conversation = await conversation_manager.fetch_chat_context(
+                    request.user_id, request.creator_id, request.conversation_id
+                )
+                if user_profile is None:
+                    # No profile row means the join could not see the conversation either
+                    user_profile = await profile_manager.get_or_create_user_profile(request.user_id)
+                    conversation = await conversation_manager.get_or_create_conversation(
+                        request.user_id, request.creator_id, request.conversation_id
+                    )
             
-            processing_time = time.time() - start_time
+            # Extract profile information from message
+            extracted_info = profile_manager.extract_profile_info(request.message, user_profile)
+            if extracted_info:
+                if user_profile is cached_profile:
+                    # Writes need the mapped row, not the cached snapshot
+                    self._profile_cache.pop(request.user_id, None)
+                    user_profile = await profile_manager.get_or_create_user_profile(request.user_id)
+                user_profile = profile_manager.update_profile(user_profile, extracted_info)
+            
+            if conversation is None:
+                conversation = await conversation_manager.get_or_create_conversation(
+                    request.user_id, request.creator_id
+                )
             
-            return ChatResponse(
-                response=ai_response,
-                conversation_id=conversation.id,
-                context_used=len(context_chunks),
-                intent=query_analysis.intent,
-                processing_time=processing_time
+            # The user message is saved with the reply, in one batch after generation
+            await conversation_manager.load_recent_messages(conversation)
+            user_message = conversation_manager.new_message(
+                conversation, MessageRole.USER, request.message
             )
             
+            # Commit new or updated profile and conversation rows before the slow calls
+            if db.new or db.dirty:
+                await db.commit()
+            
+            # Write-through after commit so the cache only ever holds persisted state
+            if user_profile is not cached_profile:
+                self._profile_cache[request.user_id] = snapshot_profile(user_profile)
+            
         except Exception as e:
             logger.error(f"Chat processing failed: {e}")
+            if context_task is not None:
+                context_task.cancel()
+            await db.rollback()
             raise
+        
+        return user_profile, conversation, user_message
+    
+    def _schedule_persist(
+        self,
+        conversation: Conversation,
+        user_message: Message,
+        ai_response: str,
+        context_chunks: List[Dict[str, Any]],
+        query_analysis: QueryAnalysis,
+        processing_time: float
+    ):
+        """Save both messages of the turn after the response is returned, on its own session"""
+        messages = [user_message]
+        if ai_response:
+            messages.append(ConversationManager.new_message(
+                conversation, MessageRole.ASSISTANT, ai_response,
+                metadata={
+                    "context_chunks_used": len(context_chunks),
+                    "processing_time": processing_time,
+                    "query_intent": query_analysis.intent.value
+                }
+            ))
+        
+        task = asyncio.create_task(self._persist_messages(conversation, messages))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _persist_messages(self, conversation: Conversation, messages: List[Message]):
+        """Save the turn's messages outside the request-scoped session"""
+        try:
+            async with db_manager.get_async_session() as session:
+                # Re-read the row under a lock (FOR UPDATE on PostgreSQL) so overlapping turns
+                # append to the current window instead of overwriting it with a stale snapshot
+                result = await session.execute(
+                    select(Conversation).where(Conversation.id == conversation.id).with_for_update()
+                )
+                ConversationManager(session).save_messages(result.scalar_one(), messages)
+        except Exception as e:
+            logger.error(f"Failed to persist messages: {e}")
     
     async def _get_context(self, query: str, creator_id: str) -> List[Dict[str, Any]]:
         """Get context from retrieval service"""
+        cache_key = (creator_id, hashlib.blake2b(query.lower().strip().encode()).hexdigest())
+        cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             retrieval_request = RetrievalRequest(
                 query=query,
@@ -454,20 +769,20 @@ class ChatProcessor:
             )
             
             # Call retrieval service
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.get_service_url('retrieval_service')}/retrieve",
-                    json=retrieval_request.dict(),
-                    timeout=10.0
-                )
+            response = await self._http.post(
+                f"{settings.get_service_url('retrieval_service')}/retrieve",
+                json=retrieval_request.dict()
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                chunks = result.get("chunks", [])
+                self._context_cache[cache_key] = chunks
+                return chunks
+            else:
+                logger.error(f"Retrieval service error: {response.status_code}")
+                return []
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("chunks", [])
-                else:
-                    logger.error(f"Retrieval service error: {response.status_code}")
-                    return []
-                    
         except Exception as e:
             logger.error(f"Failed to get context: {e}")
             return []
@@ -477,15 +792,13 @@ class ChatProcessor:
         query_lower = query.lower()
         
         # Check for greetings
-        greetings = ["hi", "hello", "hey", "namaste", "hola"]
-        is_greeting = any(greeting in query_lower for greeting in greetings)
+        is_greeting = bool(_GREETING_RE.search(query_lower))
         
         # Check for inappropriate content
-        inappropriate_keywords = ["sex", "porn", "adult", "nsfw", "sext"]
-        is_inappropriate = any(keyword in query_lower for keyword in inappropriate_keywords)
+        is_inappropriate = bool(_INAPPROPRIATE_RE.search(query_lower))
         
         # Check for how-to questions
-        is_step_by_step = "how to" in query_lower or "steps" in query_lower or "kaise" in query_lower
+        is_step_by_step = bool(_STEP_RE.search(query_lower))
         
         # Determine intent
         if is_greeting:
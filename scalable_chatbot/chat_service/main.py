@@ -1,13 +1,16 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import redis
+from redis import asyncio as aioredis
 import logging
 import time
 import asyncio
-from typing import Dict, Any
+import orjson
+from typing import Dict, Any, AsyncIterator, Tuple
 from sqlalchemy.orm import Session
-from database.connection import get_db, db_manager
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_db, get_async_db, db_manager
 from shared.models import ChatRequest, ChatResponse
 from chat_service.chat_processor import ChatProcessor
 from config.settings import settings
@@ -35,14 +38,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Redis for rate limiting
-redis_client = redis.Redis(
+# Initialize Redis for rate limiting; async so calls never block the event loop
+redis_pool = aioredis.ConnectionPool(
     host=settings.redis.host,
     port=settings.redis.port,
     db=settings.redis.db,
     password=settings.redis.password,
     decode_responses=True
 )
+redis_client = aioredis.Redis(connection_pool=redis_pool)
 
 # Security
 security = HTTPBearer(auto_error=False)
@@ -50,30 +54,31 @@ security = HTTPBearer(auto_error=False)
 # Global chat processor
 chat_processor = ChatProcessor()
 
+# Fixed-window counter in one atomic round trip: the first hit in a window sets its expiry
+# ARGV: window length in seconds
+RATE_LIMIT_SCRIPT = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return current
+"""
+
 class RateLimiter:
     """Rate limiting middleware"""
     
     def __init__(self, max_requests: int = 100, window_seconds: int = 3600):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        # redis-py runs this via EVALSHA and reloads it on NoScriptError
+        self.script = redis_client.register_script(RATE_LIMIT_SCRIPT)
     
     async def check_rate_limit(self, user_id: str) -> bool:
         """Check if user has exceeded rate limit"""
         try:
             key = f"rate_limit:{user_id}"
-            current = redis_client.get(key)
-            
-            if current is None:
-                # First request in window
-                redis_client.setex(key, self.window_seconds, 1)
-                return True
-            
-            if int(current) >= self.max_requests:
-                return False
-            
-            # Increment counter
-            redis_client.incr(key)
-            return True
+            current = await self.script(keys=[key], args=[self.window_seconds])
+            return int(current) <= self.max_requests
             
         except Exception as e:
             logger.error(f"Rate limiting error: {e}")
@@ -106,7 +111,10 @@ async def startup_event():
         await db_manager.initialize_async_db()
         
         # Test Redis connection
-        redis_client.ping()
+        await redis_client.ping()
+        
+        # Count static prompt tokens once for context budgeting
+        await chat_processor.ai_generator.load_static_token_counts()
         
         logger.info("Chat Service started successfully")
         
@@ -118,6 +126,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Chat Service shutting down...")
+    await chat_processor.close()
+    await redis_pool.disconnect()
     await db_manager.close_connections()
 
 @app.get("/health")
@@ -129,7 +139,7 @@ async def health_check():
             db.execute("SELECT 1")
         
         # Check Redis
-        redis_client.ping()
+        await redis_client.ping()
         
         return {
             "status": "healthy",
@@ -169,10 +179,10 @@ async def readiness_check():
 async def chat_endpoint(
     request: ChatRequest,
     user_id: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Process chat message"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         # Override user_id from auth
@@ -197,7 +207,7 @@ async def chat_endpoint(
         # Process chat
         response = await chat_processor.process_chat(request, db)
         
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.info(f"Chat processed in {processing_time:.2f}s")
         
         return response
@@ -208,6 +218,56 @@ async def chat_endpoint(
         logger.error(f"Chat processing failed: {e}")
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
+def format_sse(event: str, payload: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event; JSON keeps newlines in the text out of the framing"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+async def sse_stream(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Frame reply events for the wire"""
+    async for event, payload in events:
+        yield format_sse(event, payload)
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    user_id: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Process chat message and stream the reply as Server-Sent Events"""
+    try:
+        # Override user_id from auth
+        request.user_id = user_id
+        
+        logger.info(f"Streaming chat for user: {user_id}, creator: {request.creator_id}")
+        
+        # Rate limiting
+        if not await rate_limiter.check_rate_limit(user_id):
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded. Please try again later."
+            )
+        
+        # Validate request
+        if not request.message.strip():
+            raise HTTPException(status_code=400, detail="Message cannot be empty")
+        
+        if not request.creator_id:
+            raise HTTPException(status_code=400, detail="Creator ID is required")
+        
+        events = await chat_processor.stream_chat(request, db)
+        
+        return StreamingResponse(
+            sse_stream(events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chat streaming failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
+
 @app.get("/conversations/{conversation_id}/messages")
 async def get_conversation_messages(
     conversation_id: str,
@@ -301,7 +361,7 @@ async def get_metrics():
             "service": "chat_service",
             "status": "running",
             "timestamp": time.time(),
-            "uptime": time.time() - startup_time if 'startup_time' in globals() else 0,
+            "uptime": time.perf_counter() - startup_time if 'startup_time' in globals() else 0,
             "database_status": "connected",
             "redis_status": "connected"
         }
@@ -324,6 +384,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "chat": "/chat",
+            "chat_stream": "/chat/stream",
             "conversations": "/conversations/{conversation_id}/messages",
             "user_conversations": "/users/{user_id}/conversations",
             "health": "/health",
@@ -333,7 +394,7 @@ async def root():
     }
 
 # Store startup time for metrics
-startup_time = time.time()
+startup_time = time.perf_counter()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,41 +1,44 @@
 import os
 from typing import Optional
 
+# One consistent snapshot; os.environ re-decodes values on every lookup
+_ENV = dict(os.environ)
+
 class Config:
     """Configuration class for the scalable chatbot system."""
     
     # Database configuration
-    DATABASE_URL: str = os.getenv(
+    DATABASE_URL: str = _ENV.get(
         "DATABASE_URL", 
         "sqlite:///./chatbot.db"  # Default to SQLite for local development
     )
     
     # Redis configuration
-    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_URL: str = _ENV.get("REDIS_URL", "redis://localhost:6379")
     
     # Weaviate configuration
-    WEAVIATE_URL: str = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-    WEAVIATE_API_KEY: Optional[str] = os.getenv("WEAVIATE_API_KEY")
+    WEAVIATE_URL: str = _ENV.get("WEAVIATE_URL", "http://localhost:8080")
+    WEAVIATE_API_KEY: Optional[str] = _ENV.get("WEAVIATE_API_KEY")
     
     # Google AI configuration
-    GOOGLE_AI_API_KEY: str = os.getenv("GOOGLE_AI_API_KEY", "")
+    GOOGLE_AI_API_KEY: str = _ENV.get("GOOGLE_AI_API_KEY", "")
     
     # API configuration
-    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
-    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    API_HOST: str = _ENV.get("API_HOST", "0.0.0.0")
+    API_PORT: int = int(_ENV.get("API_PORT", "8000"))
     
     # Rate limiting
-    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_PER_MINUTE: int = int(_ENV.get("RATE_LIMIT_PER_MINUTE", "60"))
     
     # Circuit breaker
-    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
-    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: int = int(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "60"))
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(_ENV.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: int = int(_ENV.get("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "60"))
     
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = _ENV.get("LOG_LEVEL", "INFO")
     
     # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+    SECRET_KEY: str = _ENV.get("SECRET_KEY", "your-secret-key-change-in-production")
     
     @classmethod
     def is_sqlite(cls) -> bool:
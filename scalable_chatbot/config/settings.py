@@ -1,111 +1,199 @@
 import os
-from typing import Dict, Any
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from shared.models import (
     DatabaseConfig, RedisConfig, WeaviateConfig, 
     ServiceConfig, RateLimitConfig, AIConfig
 )
 
+# Each service reads <name>_port and <name>_workers from _EnvSettings
+_SERVICE_NAMES = ("api_gateway", "chat_service", "creator_service", "retrieval_service")
+
+class _EnvSettings(BaseSettings):
+    """Raw environment values, parsed and type-converted in one pass"""
+    
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, case_sensitive=False, extra="ignore")
+    
+    environment: str = "development"
+    debug: bool = False
+    
+    db_host: str = "localhost"
+    db_port: int = 5432
+    db_name: str = "chatbot"
+    db_user: str = "user"
+    db_password: str = "password"
+    
+    redis_host: str = "localhost"
+    redis_port: int = 6379
+    redis_db: int = 0
+    redis_password: Optional[str] = None
+    
+    weaviate_host: str = "localhost"
+    weaviate_port: int = 8080
+    
+    google_api_key: str = ""
+    ai_model_name: str = "gemini-1.5-flash"
+    ai_max_tokens: int = 2048
+    ai_max_prompt_tokens: int = 8192
+    ai_temperature: float = 0.7
+    
+    rate_limit_max: int = 100
+    rate_limit_window: int = 3600
+    
+    api_gateway_port: int = 8000
+    # Pure I/O proxy: default to 2 * cores + 1 workers
+    api_gateway_workers: int = Field(default_factory=lambda: 2 * (os.cpu_count() or 1) + 1)
+    chat_service_port: int = 8001
+    chat_service_workers: int = 8
+    creator_service_port: int = 8002
+    creator_service_workers: int = 4
+    retrieval_service_port: int = 8003
+    retrieval_service_workers: int = 6
+    
+    chat_service_url: str = "http://chat-service:8001"
+    creator_service_url: str = "http://creator-service:8002"
+    retrieval_service_url: str = "http://retrieval-service:8003"
+    
+    jwt_secret: str = "your-secret-key-change-in-production"
+    jwt_algorithm: str = "HS256"
+    jwt_expiration_hours: int = 24
+    
+    # Comma-separated; list fields would be JSON-decoded by pydantic-settings
+    cors_origins: str = "*"
+    
+    log_level: str = "INFO"
+    log_format: str = "json"
+    
+    max_concurrent_requests: int = 100
+    request_timeout: int = 30
+    health_cache_ttl: float = 5.0
+    
+    vector_store_prefix: str = "creator_"
+    
+    max_chunk_size: int = 1000
+    chunk_overlap: int = 200
+    
+    @field_validator("debug", mode="before")
+    @classmethod
+    def _parse_debug(cls, value: Any) -> bool:
+        # Only "true" enables debug; anything else (empty, "release", ...) means off
+        return value if isinstance(value, bool) else str(value).strip().lower() == "true"
+
 class Settings:
-    """Centralized configuration management"""
+    """Centralized configuration management (process-wide singleton)"""
+    
+    _instance = None
     
-    def __init__(self):
-        self.environment = os.getenv("ENVIRONMENT", "development")
-        self.debug = os.getenv("DEBUG", "false").lower() == "true"
+    def __new__(cls):
+        if cls._instance is None:
+            instance = super().__new__(cls)
+            instance._init()
+            cls._instance = instance
+        return cls._instance
+    
+    @classmethod
+    def reset(cls):
+        """Drop the cached instance so the next Settings() re-reads the environment"""
+        cls._instance = None
+    
+    def _init(self):
+        env = _EnvSettings()
+        self.environment = env.environment
+        self.debug = env.debug
         
         # Database Configuration
         self.database = DatabaseConfig(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=int(os.getenv("DB_PORT", "5432")),
-            database=os.getenv("DB_NAME", "chatbot"),
-            username=os.getenv("DB_USER", "user"),
-            password=os.getenv("DB_PASSWORD", "password")
+            host=env.db_host,
+            port=env.db_port,
+            database=env.db_name,
+            username=env.db_user,
+            password=env.db_password
         )
         
         # Redis Configuration
         self.redis = RedisConfig(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=int(os.getenv("REDIS_PORT", "6379")),
-            db=int(os.getenv("REDIS_DB", "0")),
-            password=os.getenv("REDIS_PASSWORD")
+            host=env.redis_host,
+            port=env.redis_port,
+            db=env.redis_db,
+            password=env.redis_password
         )
         
         # Weaviate Configuration
         self.weaviate = WeaviateConfig(
-            host=os.getenv("WEAVIATE_HOST", "localhost"),
-            port=int(os.getenv("WEAVIATE_PORT", "8080"))
+            host=env.weaviate_host,
+            port=env.weaviate_port
         )
         
         # AI Configuration
         self.ai = AIConfig(
-            google_api_key=os.getenv("GOOGLE_API_KEY", ""),
-            model_name=os.getenv("AI_MODEL_NAME", "gemini-1.5-flash"),
-            max_tokens=int(os.getenv("AI_MAX_TOKENS", "2048")),
-            temperature=float(os.getenv("AI_TEMPERATURE", "0.7"))
+            google_api_key=env.google_api_key,
+            model_name=env.ai_model_name,
+            max_tokens=env.ai_max_tokens,
+            max_prompt_tokens=env.ai_max_prompt_tokens,
+            temperature=env.ai_temperature
         )
         
         # Rate Limiting
         self.rate_limit = RateLimitConfig(
-            max_requests=int(os.getenv("RATE_LIMIT_MAX", "100")),
-            window_seconds=int(os.getenv("RATE_LIMIT_WINDOW", "3600"))
+            max_requests=env.rate_limit_max,
+            window_seconds=env.rate_limit_window
         )
         
-        # Service Configurations
-        self.services = {
-            "api_gateway": ServiceConfig(
-                name="api_gateway",
-                port=int(os.getenv("API_GATEWAY_PORT", "8000")),
-                workers=int(os.getenv("API_GATEWAY_WORKERS", "4"))
-            ),
-            "chat_service": ServiceConfig(
-                name="chat_service",
-                port=int(os.getenv("CHAT_SERVICE_PORT", "8001")),
-                workers=int(os.getenv("CHAT_SERVICE_WORKERS", "8"))
-            ),
-            "creator_service": ServiceConfig(
-                name="creator_service",
-                port=int(os.getenv("CREATOR_SERVICE_PORT", "8002")),
-                workers=int(os.getenv("CREATOR_SERVICE_WORKERS", "4"))
-            ),
-            "retrieval_service": ServiceConfig(
-                name="retrieval_service",
-                port=int(os.getenv("RETRIEVAL_SERVICE_PORT", "8003")),
-                workers=int(os.getenv("RETRIEVAL_SERVICE_WORKERS", "6"))
-            )
-        }
+        # Service configurations are built on first use by get_service_config
+        self._env = env
+        self._service_configs: Dict[str, ServiceConfig] = {}
         
         # Service URLs (for inter-service communication)
         self.service_urls = {
-            "chat_service": os.getenv("CHAT_SERVICE_URL", "http://chat-service:8001"),
-            "creator_service": os.getenv("CREATOR_SERVICE_URL", "http://creator-service:8002"),
-            "retrieval_service": os.getenv("RETRIEVAL_SERVICE_URL", "http://retrieval-service:8003")
+            "chat_service": env.chat_service_url,
+            "creator_service": env.creator_service_url,
+            "retrieval_service": env.retrieval_service_url
         }
         
         # Security
-        self.jwt_secret = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
-        self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
-        self.jwt_expiration_hours = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+        self.jwt_secret = env.jwt_secret
+        self.jwt_algorithm = env.jwt_algorithm
+        self.jwt_expiration_hours = env.jwt_expiration_hours
         
         # CORS
-        self.cors_origins = os.getenv("CORS_ORIGINS", "*").split(",")
+        self.cors_origins = env.cors_origins.split(",")
         
         # Logging
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        self.log_format = os.getenv("LOG_FORMAT", "json")
+        self.log_level = env.log_level
+        self.log_format = env.log_format
         
         # Performance
-        self.max_concurrent_requests = int(os.getenv("MAX_CONCURRENT_REQUESTS", "100"))
-        self.request_timeout = int(os.getenv("REQUEST_TIMEOUT", "30"))
+        self.max_concurrent_requests = env.max_concurrent_requests
+        self.request_timeout = env.request_timeout
+        self.health_cache_ttl = env.health_cache_ttl
         
         # Vector Store
-        self.vector_store_collection_prefix = os.getenv("VECTOR_STORE_PREFIX", "creator_")
+        self.vector_store_collection_prefix = env.vector_store_prefix
         
         # Content Processing
-        self.max_chunk_size = int(os.getenv("MAX_CHUNK_SIZE", "1000"))
-        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "200"))
+        self.max_chunk_size = env.max_chunk_size
+        self.chunk_overlap = env.chunk_overlap
         
-    def get_service_config(self, service_name: str) -> ServiceConfig:
+    def get_service_config(self, service_name: str) -> Optional[ServiceConfig]:
         """Get configuration for a specific service"""
-        return self.services.get(service_name)
+        config = self._service_configs.get(service_name)
+        if config is None and service_name in _SERVICE_NAMES:
+            config = ServiceConfig(
+                name=service_name,
+                port=getattr(self._env, f"{service_name}_port"),
+                workers=getattr(self._env, f"{service_name}_workers")
+            )
+            self._service_configs[service_name] = config
+        return config
+    
+    @property
+    def services(self) -> Dict[str, ServiceConfig]:
+        """Configurations for every known service"""
+        return {name: self.get_service_config(name) for name in _SERVICE_NAMES}
     
     def get_service_url(self, service_name: str) -> str:
         """Get URL for a specific service"""
@@ -123,7 +211,7 @@ class Settings:
 settings = Settings()
 
 # Creator configurations (can be moved to database later)
-CREATORS = {
+_CREATOR_DEFINITIONS = {
     "hawa_singh": {
         "id": "hawa_singh",
         "name": "Hawa Singh",
@@ -144,10 +232,40 @@ CREATORS = {
     # Add more creators here as needed
 }
 
-def get_creator_config(creator_id: str) -> Dict[str, Any]:
-    """Get configuration for a specific creator"""
-    return CREATORS.get(creator_id, {})
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings (interned keys) and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(key): _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def thaw_config(value: Any) -> Any:
+    """Copy frozen creator config into plain dicts and lists for json/orjson serialization"""
+    if isinstance(value, Mapping):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_config(item) for item in value]
+    return value
+
+# Read-only table shared by every caller; edit _CREATOR_DEFINITIONS instead.
+# Accessors return it as-is; serialize through thaw_config.
+_CREATORS: Mapping[str, Mapping[str, Any]] = _freeze(_CREATOR_DEFINITIONS)
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_SLUG_TO_ID: Mapping[str, str] = MappingProxyType(
+    {sys.intern(config["slug"]): creator_id for creator_id, config in _CREATORS.items()}
+)
+
+@lru_cache(maxsize=256)
+def get_creator_config(creator_id: str) -> Mapping[str, Any]:
+    """Get configuration for a specific creator (immutable, so safe to memoize)"""
+    return _CREATORS.get(creator_id, _EMPTY)
+
+def get_creator_by_slug(slug: str) -> Mapping[str, Any]:
+    """Get configuration for a creator by URL slug"""
+    creator_id = _SLUG_TO_ID.get(slug)
+    return _CREATORS[creator_id] if creator_id is not None else _EMPTY
 
-def get_all_creators() -> Dict[str, Dict[str, Any]]:
+def get_all_creators() -> Mapping[str, Mapping[str, Any]]:
     """Get all creator configurations"""
-    return CREATORS 
\ No newline at end of file
+    return _CREATORS
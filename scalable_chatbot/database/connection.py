@@ -1,24 +1,61 @@
 from sqlalchemy import create_engine, MetaData
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import contextmanager, asynccontextmanager
+from typing import Any, Dict, Generator, AsyncGenerator
 import logging
+import os
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 # SQLAlchemy setup
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base for all ORM models"""
+    pass
+
 metadata = MetaData()
 
+def get_async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """Pooling and logging options shared by the sync and async engines"""
+    # Statement logging formats every query, so only enable it when debugging
+    options: Dict[str, Any] = {"echo": Config.LOG_LEVEL.upper() == "DEBUG"}
+    if Config.is_sqlite():
+        # SQLite configuration for local development
+        options["connect_args"] = {"check_same_thread": False}
+        if make_url(url).database in (None, "", ":memory:"):
+            # An in-memory database only exists on a single connection
+            options["poolclass"] = StaticPool
+        # File databases keep SQLAlchemy's default queue pool
+    else:
+        # PostgreSQL configuration for production
+        options.update(
+            pool_pre_ping=True,
+            pool_recycle=300,
+            pool_size=20,
+            max_overflow=10,
+            pool_timeout=30
+        )
+    return options
+
 class DatabaseManager:
     """Manages database connections with connection pooling"""
     
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self.async_engine = None
+        self.AsyncSessionLocal = None
         self._initialized = False
     
     def initialize_sync_db(self):
@@ -28,22 +65,10 @@ class DatabaseManager:
             
         try:
             # Create engine with connection pooling
-            if Config.is_sqlite():
-                # SQLite configuration for local development
-                self.engine = create_engine(
-                    Config.DATABASE_URL,
-                    connect_args={"check_same_thread": False},
-                    poolclass=StaticPool,
-                    echo=True  # Enable SQL logging for debugging
-                )
-            else:
-                # PostgreSQL configuration for production
-                self.engine = create_engine(
-                    Config.DATABASE_URL,
-                    pool_pre_ping=True,
-                    pool_recycle=300,
-                    echo=True
-                )
+            self.engine = create_engine(
+                Config.DATABASE_URL,
+                **get_engine_options(Config.DATABASE_URL)
+            )
             
             # Create session factory
             self.SessionLocal = sessionmaker(
@@ -59,6 +84,31 @@ class DatabaseManager:
             logger.error(f"Failed to initialize sync database: {e}")
             raise
     
+    async def initialize_async_db(self):
+        """Initialize asynchronous database connection"""
+        if self.async_engine is not None:
+            return
+            
+        try:
+            async_url = get_async_database_url(Config.DATABASE_URL)
+            self.async_engine = create_async_engine(
+                async_url,
+                **get_engine_options(async_url)
+            )
+            
+            # Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+            self.AsyncSessionLocal = async_sessionmaker(
+                bind=self.async_engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            
+            logger.info("Asynchronous database connection initialized")
+            
+        except Exception as e:
+            logger.error(f"Failed to initialize async database: {e}")
+            raise
+    
     @contextmanager
     def get_db_session(self) -> Generator[Session, None, None]:
         """Get synchronous database session with automatic cleanup"""
@@ -76,8 +126,33 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @asynccontextmanager
+    async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Get asynchronous database session with automatic cleanup"""
+        if self.async_engine is None:
+            await self.initialize_async_db()
+            
+        session = self.AsyncSessionLocal()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Database session error: {e}")
+            raise
+        finally:
+            await session.close()
+    
     def create_tables(self):
-        """Create all database tables"""
+        """Create all tables for a fresh local SQLite database (other schemas are managed by Alembic)"""
+        if not Config.is_sqlite():
+            logger.info("Skipping create_all; run `alembic upgrade head` to migrate the schema")
+            return
+        
+        db_file = make_url(Config.DATABASE_URL).database
+        if db_file not in (None, "", ":memory:") and os.path.exists(db_file):
+            return
+        
         if not self._initialized:
             self.initialize_sync_db()
             
@@ -88,11 +163,13 @@ class DatabaseManager:
             logger.error(f"Failed to create tables: {e}")
             raise
     
-    def close_connections(self):
+    async def close_connections(self):
         """Close all database connections"""
         if self.engine:
             self.engine.dispose()
-            logger.info("Database connections closed")
+        if self.async_engine:
+            await self.async_engine.dispose()
+        logger.info("Database connections closed")
 
 # Global database manager instance
 db_manager = DatabaseManager()
@@ -101,4 +178,9 @@ db_manager = DatabaseManager()
 def get_db() -> Generator[Session, None, None]:
     """FastAPI dependency for database sessions"""
     with db_manager.get_db_session() as session:
-        yield session 
\ No newline at end of file
+        yield session 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency for async database sessions"""
+    async with db_manager.get_async_session() as session:
+        yield session
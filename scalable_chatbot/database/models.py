@@ -1,38 +1,62 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, JSON, Index, FetchedValue
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
 from config import Config
+import os
+import time
 import uuid
 
-# Conditional UUID column type
+# The backend is fixed for the life of the process, so resolve the UUID type once
+_IS_SQLITE = Config.is_sqlite()
+_UUID_COL = String(36) if _IS_SQLITE else UUID(as_uuid=True)  # SQLite doesn't support UUID natively
+
 def get_uuid_column():
     """Return appropriate UUID column type based on database"""
-    if Config.is_sqlite():
-        return String(36)  # SQLite doesn't support UUID natively
-    else:
-        return UUID(as_uuid=True)
+    return _UUID_COL
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit ms timestamp, then random bits.
+
+    Used for insert-heavy tables so new keys land at the right edge of the
+    primary key index instead of splitting pages across it.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+def uuid_pk(default=uuid.uuid4):
+    """Primary key column with a UUID default (random unless given)"""
+    return Column(_UUID_COL, primary_key=True, default=default)
+
+def updated_at_column():
+    """updated_at column, bumped by the set_updated_at() trigger on PostgreSQL and by the ORM on SQLite"""
+    if _IS_SQLITE:
+        return Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # FetchedValue tells the ORM the database changes it, so the attribute is expired after UPDATE
+    return Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
+    id = uuid_pk()
     email = Column(String(255), unique=True, nullable=True)
     name = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = updated_at_column()
     
-    # Relationships
-    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
-    conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan")
-    profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    rate_limits = relationship("RateLimit", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (never lazy-load; use selectinload/joinedload in the query)
+    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan", lazy="raise_on_sql")
+    conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan", lazy="raise_on_sql")
+    profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
+    rate_limits = relationship("RateLimit", back_populates="user", cascade="all, delete-orphan", lazy="raise_on_sql")
 
 class Creator(Base):
     __tablename__ = "creators"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
+    id = uuid_pk()
     name = Column(String(255), nullable=False)
     slug = Column(String(100), unique=True, nullable=False)
     specialty = Column(String(255), nullable=True)
@@ -43,8 +67,8 @@ class Creator(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    sessions = relationship("UserSession", back_populates="creator")
-    conversations = relationship("Conversation", back_populates="creator")
+    sessions = relationship("UserSession", back_populates="creator", lazy="raise_on_sql")
+    conversations = relationship("Conversation", back_populates="creator", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
@@ -55,20 +79,19 @@ class Creator(Base):
 class UserSession(Base):
     __tablename__ = "user_sessions"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    user_id = Column(get_uuid_column(), ForeignKey("users.id"), nullable=False)
-    creator_id = Column(get_uuid_column(), ForeignKey("creators.id"), nullable=False)
+    id = uuid_pk()
+    user_id = Column(_UUID_COL, ForeignKey("users.id"), nullable=False)
+    creator_id = Column(_UUID_COL, ForeignKey("creators.id"), nullable=False)
     session_token = Column(String(255), unique=True, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="sessions")
-    creator = relationship("Creator", back_populates="sessions")
+    user = relationship("User", back_populates="sessions", lazy="raise_on_sql")
+    creator = relationship("Creator", back_populates="sessions", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
-        Index('idx_sessions_token', 'session_token'),
         Index('idx_sessions_user', 'user_id'),
         Index('idx_sessions_expires', 'expires_at'),
     )
@@ -76,17 +99,18 @@ class UserSession(Base):
 class Conversation(Base):
     __tablename__ = "conversations"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    user_id = Column(get_uuid_column(), ForeignKey("users.id"), nullable=False)
-    creator_id = Column(get_uuid_column(), ForeignKey("creators.id"), nullable=False)
+    id = uuid_pk()
+    user_id = Column(_UUID_COL, ForeignKey("users.id"), nullable=False)
+    creator_id = Column(_UUID_COL, ForeignKey("creators.id"), nullable=False)
     title = Column(String(255), nullable=True)
+    recent_messages = Column(JSON, nullable=True)  # Rolling window of the last {role, content} turns
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = updated_at_column()
     
     # Relationships
-    user = relationship("User", back_populates="conversations")
-    creator = relationship("Creator", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    user = relationship("User", back_populates="conversations", lazy="raise_on_sql")
+    creator = relationship("Creator", back_populates="conversations", lazy="raise_on_sql")
+    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
@@ -98,38 +122,37 @@ class Conversation(Base):
 class Message(Base):
     __tablename__ = "messages"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    conversation_id = Column(get_uuid_column(), ForeignKey("conversations.id"), nullable=False)
+    id = uuid_pk(uuid7)
+    conversation_id = Column(_UUID_COL, ForeignKey("conversations.id"), nullable=False)
     role = Column(String(20), nullable=False)  # 'user' or 'assistant'
     content = Column(Text, nullable=False)
     message_metadata = Column(JSON, nullable=True)  # Store additional message metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
+    conversation = relationship("Conversation", back_populates="messages", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
-        Index('idx_messages_conversation', 'conversation_id'),
-        Index('idx_messages_created', 'created_at'),
+        Index('idx_msg_conv_created', 'conversation_id', 'created_at'),
         Index('idx_messages_role', 'role'),
     )
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    user_id = Column(get_uuid_column(), ForeignKey("users.id"), unique=True, nullable=False)
+    id = uuid_pk()
+    user_id = Column(_UUID_COL, ForeignKey("users.id"), unique=True, nullable=False)
     channel_name = Column(String(255), nullable=True)
     subscriber_count = Column(Integer, nullable=True)
     content_type = Column(String(100), nullable=True)
     goals = Column(JSON, nullable=True)  # Array of goals
     equipment = Column(JSON, nullable=True)  # Array of equipment
     profile_data = Column(JSON, nullable=True)  # Additional profile data
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = updated_at_column()
     
     # Relationships
-    user = relationship("User", back_populates="profile")
+    user = relationship("User", back_populates="profile", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
@@ -140,14 +163,14 @@ class UserProfile(Base):
 class RateLimit(Base):
     __tablename__ = "rate_limits"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    user_id = Column(get_uuid_column(), ForeignKey("users.id"), nullable=False)
+    id = uuid_pk(uuid7)
+    user_id = Column(_UUID_COL, ForeignKey("users.id"), nullable=False)
     endpoint = Column(String(100), nullable=False)
     requests_count = Column(Integer, default=0)
     window_start = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="rate_limits")
+    user = relationship("User", back_populates="rate_limits", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
@@ -158,9 +181,9 @@ class RateLimit(Base):
 class Analytics(Base):
     __tablename__ = "analytics"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
-    user_id = Column(get_uuid_column(), ForeignKey("users.id"), nullable=True)
-    creator_id = Column(get_uuid_column(), ForeignKey("creators.id"), nullable=True)
+    id = uuid_pk(uuid7)
+    user_id = Column(_UUID_COL, ForeignKey("users.id"), nullable=True)
+    creator_id = Column(_UUID_COL, ForeignKey("creators.id"), nullable=True)
     event_type = Column(String(50), nullable=False)  # 'message_sent', 'session_started', etc.
     event_data = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -170,13 +193,15 @@ class Analytics(Base):
         Index('idx_analytics_user', 'user_id'),
         Index('idx_analytics_creator', 'creator_id'),
         Index('idx_analytics_event', 'event_type'),
-        Index('idx_analytics_created', 'created_at'),
+        # Append-only and time-ordered: BRIN stays tiny on PostgreSQL (plain index elsewhere)
+        Index('idx_analytics_created_brin', 'created_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
     )
 
 class SystemHealth(Base):
     __tablename__ = "system_health"
     
-    id = Column(get_uuid_column(), primary_key=True, default=uuid.uuid4)
+    id = uuid_pk(uuid7)
     service_name = Column(String(100), nullable=False)
     status = Column(String(20), nullable=False)  # 'healthy', 'degraded', 'unhealthy'
     response_time = Column(Integer, nullable=True)  # in milliseconds
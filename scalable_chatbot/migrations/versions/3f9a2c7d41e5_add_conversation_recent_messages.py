@@ -0,0 +1,26 @@
+"""Add recent_messages window to conversations
+
+Revision ID: 3f9a2c7d41e5
+Revises: 06cbb75ba0b8
+Create Date: 2026-10-16 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c7d41e5'
+down_revision: Union[str, None] = '06cbb75ba0b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('recent_messages', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'recent_messages')
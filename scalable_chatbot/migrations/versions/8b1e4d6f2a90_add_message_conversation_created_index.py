@@ -0,0 +1,28 @@
+"""Replace messages conversation index with (conversation_id, created_at)
+
+Revision ID: 8b1e4d6f2a90
+Revises: 3f9a2c7d41e5
+Create Date: 2026-10-16 14:03:52.618204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4d6f2a90'
+down_revision: Union[str, None] = '3f9a2c7d41e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_msg_conv_created', 'messages', ['conversation_id', 'created_at'], unique=False)
+    op.drop_index('idx_messages_conversation', table_name='messages')
+
+
+def downgrade() -> None:
+    op.create_index('idx_messages_conversation', 'messages', ['conversation_id'], unique=False)
+    op.drop_index('idx_msg_conv_created', table_name='messages')
@@ -0,0 +1,33 @@
+"""Drop redundant session/message indexes and use BRIN for analytics created_at
+
+Revision ID: c4d7e2a91b35
+Revises: 8b1e4d6f2a90
+Create Date: 2026-10-16 15:27:09.441873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e2a91b35'
+down_revision: Union[str, None] = '8b1e4d6f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_sessions_token', table_name='user_sessions')
+    op.drop_index('idx_messages_created', table_name='messages')
+    op.drop_index('idx_analytics_created', table_name='analytics')
+    op.create_index('idx_analytics_created_brin', 'analytics', ['created_at'], unique=False,
+                    postgresql_using='brin', postgresql_with={'pages_per_range': 32})
+
+
+def downgrade() -> None:
+    op.drop_index('idx_analytics_created_brin', table_name='analytics')
+    op.create_index('idx_analytics_created', 'analytics', ['created_at'], unique=False)
+    op.create_index('idx_messages_created', 'messages', ['created_at'], unique=False)
+    op.create_index('idx_sessions_token', 'user_sessions', ['session_token'], unique=False)
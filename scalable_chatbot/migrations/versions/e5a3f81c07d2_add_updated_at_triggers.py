@@ -0,0 +1,49 @@
+"""Maintain updated_at with a BEFORE UPDATE trigger on PostgreSQL
+
+Revision ID: e5a3f81c07d2
+Revises: c4d7e2a91b35
+Create Date: 2026-10-16 16:05:44.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a3f81c07d2'
+down_revision: Union[str, None] = 'c4d7e2a91b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPDATED_AT_TABLES = ('users', 'conversations', 'user_profiles')
+
+
+def upgrade() -> None:
+    # SQLite keeps the ORM-side onupdate
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute("""
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in UPDATED_AT_TABLES:
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
@@ -1,12 +1,16 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
 import time
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from shared.models import RetrievalRequest, RetrievalResponse
-from retrieval_service.retrieval import IntelligentRetriever
 from config.settings import settings
 
+if TYPE_CHECKING:
+    from retrieval_service.retrieval import IntelligentRetriever
+
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
@@ -18,7 +22,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Retrieval Service",
     description="Scalable context retrieval service for creator chatbots",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -30,19 +35,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global retriever instance (not singleton, just a service instance)
-retriever = IntelligentRetriever()
+# Global retriever instance, created on first use so importing the app stays cheap
+_retriever: Optional["IntelligentRetriever"] = None
+_retriever_lock = asyncio.Lock()
+
+def _build_retriever() -> "IntelligentRetriever":
+    from retrieval_service.retrieval import IntelligentRetriever
+    return IntelligentRetriever()
+
+async def get_retriever() -> "IntelligentRetriever":
+    """Return the service retriever, building it exactly once on first call"""
+    global _retriever
+    if _retriever is None:
+        async with _retriever_lock:
+            if _retriever is None:
+                # The import and client setup block, so keep them off the event loop
+                _retriever = await asyncio.to_thread(_build_retriever)
+    return _retriever
+
+class _HealthCache:
+    """Share one retriever health check across probes for a short TTL"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.result: Optional[Dict[str, Any]] = None
+        self.expires_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+    
+    async def get(self, fresh: bool = False) -> Dict[str, Any]:
+        """Return the cached result, or join the single in-flight check"""
+        if not fresh and self.result is not None and time.monotonic() < self.expires_at:
+            return self.result
+        
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # Shield so one disconnecting probe does not cancel the check for everyone
+        return await asyncio.shield(self._inflight)
+    
+    async def _refresh(self) -> Dict[str, Any]:
+        try:
+            retriever = await get_retriever()
+            result = await retriever.health_check()
+            self.result = result
+            self.expires_at = time.monotonic() + self.ttl
+            return result
+        finally:
+            self._inflight = None
+
+health_cache = _HealthCache(settings.health_cache_ttl)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize service on startup"""
     logger.info("Retrieval Service starting up...")
     
-    # Perform health check
-    health = await retriever.health_check()
-    if health["status"] != "healthy":
-        logger.error(f"Service unhealthy on startup: {health}")
-        raise Exception("Service failed health check on startup")
+    # No health check here: that would build the retriever at boot. The first /retrieve or
+    # probe builds it, and /ready reports 503 until its dependencies are reachable.
     
     logger.info("Retrieval Service started successfully")
 
@@ -52,10 +100,10 @@ async def shutdown_event():
     logger.info("Retrieval Service shutting down...")
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
+async def health_check(fresh: bool = False):
+    """Health check endpoint (pass ?fresh=1 to bypass the cache)"""
     try:
-        health = await retriever.health_check()
+        health = await health_cache.get(fresh=fresh)
         if health["status"] == "healthy":
             return health
         else:
@@ -68,7 +116,7 @@ async def health_check():
 async def readiness_check():
     """Readiness check for Kubernetes"""
     try:
-        health = await retriever.health_check()
+        health = await health_cache.get()
         if health["status"] == "healthy":
             return {"status": "ready"}
         else:
@@ -76,7 +124,7 @@ async def readiness_check():
     except Exception as e:
         raise HTTPException(status_code=503, detail={"status": "not_ready", "error": str(e)})
 
-@app.post("/retrieve", response_model=RetrievalResponse)
+@app.post("/retrieve", responses={200: {"model": RetrievalResponse}})
 async def retrieve_context(request: RetrievalRequest):
     """Retrieve relevant context for a query"""
     start_time = time.time()
@@ -92,12 +140,14 @@ async def retrieve_context(request: RetrievalRequest):
             raise HTTPException(status_code=400, detail="Creator ID is required")
         
         # Perform retrieval
+        retriever = await get_retriever()
         response = await retriever.retrieve_context(request)
         
         processing_time = time.time() - start_time
         logger.info(f"Retrieved {response.total_chunks} chunks in {processing_time:.2f}s")
         
-        return response
+        # Built in-process from validated models, so skip response_model re-validation
+        return ORJSONResponse(content=response.model_dump(mode="json"))
         
     except HTTPException:
         raise
@@ -109,7 +159,7 @@ async def retrieve_context(request: RetrievalRequest):
 async def get_metrics():
     """Get service metrics"""
     try:
-        health = await retriever.health_check()
+        health = await health_cache.get()
         return {
             "service": "retrieval_service",
             "status": health["status"],
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
@@ -114,8 +114,10 @@ class QueryAnalysis(BaseModel):
     is_step_by_step: bool
     confidence: float
 
-# Configuration Models
+# Configuration Models (frozen; pydantic v2 BaseModel has no slots option, so instances keep a __dict__)
 class DatabaseConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     host: str = "localhost"
     port: int = 5432
     database: str = "chatbot"
@@ -127,12 +129,16 @@ class DatabaseConfig(BaseModel):
         return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
 
 class RedisConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     host: str = "localhost"
     port: int = 6379
     db: int = 0
     password: Optional[str] = None
 
 class WeaviateConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     host: str = "localhost"
     port: int = 8080
     
@@ -141,6 +147,8 @@ class WeaviateConfig(BaseModel):
         return f"http://{self.host}:{self.port}"
 
 class ServiceConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     host: str = "0.0.0.0"
     port: int
@@ -148,11 +156,16 @@ class ServiceConfig(BaseModel):
     workers: int = 1
     
 class RateLimitConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     max_requests: int = 100
     window_seconds: int = 3600
     
 class AIConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     google_api_key: str
     model_name: str = "gemini-1.5-flash"
     max_tokens: int = 2048
+    max_prompt_tokens: int = 8192
     temperature: float = 0.7 
\ No newline at end of file